@@ -1,7 +1,11 @@
 import subprocess
 import os
+import sys
+import time
+import threading
 import ctypes
-import re # Added for filename sanitization
+import re # For parsing makemkvcon output
+from concurrent.futures import ThreadPoolExecutor
 import requests # For Pushbullet notification
 
 # --- USER CONFIGURATION ---
@@ -14,6 +18,17 @@ makemkv_drive_specifier = "disc:0"
 title_to_rip = "0"                  # Title index 0 (Main movie "Title #1")
 # --- END USER CONFIGURATION ---
 
+# Disc title fields in `makemkvcon -r info` output, matched one line at a time
+DRV_TITLE_RE = re.compile(r'^DRV:0,2,[^,]*,[^,]*,"[^"]*","([^"]*)"') # Volume label of the loaded disc
+CINFO_TITLE_RE = re.compile(r'^CINFO:1,0,"(.*)"$') # Metadata title
+
+# Drops characters that are illegal in Windows filenames (and line breaks) and turns spaces into underscores
+SANITIZE_TABLE = str.maketrans({**{c: None for c in '\\/:*?"<>|\r\n\t'}, " ": "_"})
+
+# Robot-mode lines from `makemkvcon -r mkv` that are not worth showing during a rip
+HIDDEN_OUTPUT_PREFIXES = (b"DRV:", b"TCOUNT:", b"CINFO:", b"TINFO:", b"SINFO:")
+PROGRESS_INTERVAL = 1.0 # Seconds between PRGV progress lines shown
+
 def send_pushbullet_notification(title: str, message: str, api_key: str):
     """
     Sends a notification via Pushbullet.
@@ -32,19 +47,25 @@ def send_pushbullet_notification(title: str, message: str, api_key: str):
     except Exception as e:
         print(f"An unexpected error occurred in send_pushbullet_notification: {e}")
 
+# Notifications are sent one at a time in the background so the Pushbullet
+# round trip never holds up the eject or the next disc
+notification_executor = ThreadPoolExecutor(max_workers=1)
+
+def queue_notification(title: str, message: str):
+    """
+    Sends a Pushbullet notification without waiting for it to be delivered.
+    """
+    notification_executor.submit(send_pushbullet_notification, title, message, PUSHBULLET_API_KEY)
+
 def sanitize_filename(filename):
     """
     Sanitizes a string to be a valid filename.
     Removes illegal characters and replaces spaces with underscores.
     """
-    if not filename:
-        return "Untitled_DVD"
-    # Remove characters that are illegal in Windows filenames
-    filename = re.sub(r'[\\\\\\\\/:*?"<>|]', "", filename)
-    # Replace spaces with underscores
-    filename = filename.replace(" ", "_")
     # Truncate if too long (Windows max path is around 260, leave room for path)
-    return filename[:100]
+    filename = (filename or "").strip().translate(SANITIZE_TABLE)[:100]
+    # A title made only of illegal characters would leave nothing to name the folder
+    return filename or "Untitled_DVD"
 
 def get_disc_title(makemkv_path, drive_specifier):
     """
@@ -54,61 +75,68 @@ def get_disc_title(makemkv_path, drive_specifier):
     print(f"Attempting to get disc title for {drive_specifier}...")
     try:
         command = [makemkv_path, "-r", "info", drive_specifier]
-        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, universal_newlines=True)
-        
-        disc_title_drv = None
-        disc_title_cinfo = None
+        # Drive lines come first, then the (slow) disc scan, which starts with
+        # CINFO; stop makemkvcon as soon as a title turns up
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, universal_newlines=True) as process:
+            for line in process.stdout:
+                # Try to get title from DRV: line first (e.g., DRV:0,2,999,1,"Device","TITLE","D:")
+                drv_match = DRV_TITLE_RE.match(line)
+                if drv_match and drv_match.group(1): # If we got a non-empty title from DRV, prioritize it
+                    process.terminate()
+                    print(f"Found disc title (from DRV line): {drv_match.group(1)}")
+                    return drv_match.group(1)
 
-        output_lines = []
-        for line in process.stdout:
-            output_lines.append(line.strip())
-            # print(f"INFO LINE: {line.strip()}") # For debugging
+                # If DRV title was empty, try CINFO: line (e.g., CINFO:1,0,"METADATA_TITLE")
+                cinfo_match = CINFO_TITLE_RE.match(line)
+                if cinfo_match and cinfo_match.group(1):
+                    process.terminate()
+                    print(f"Found disc title (from CINFO line): {cinfo_match.group(1)}")
+                    return cinfo_match.group(1)
 
-        process.wait() # Ensure process is finished before parsing
-
-        for line in output_lines:
-            # Try to get title from DRV: line first (e.g., DRV:0,2,999,1,"Device","TITLE","D:")
-            if line.startswith("DRV:0,2,"): # Check for the specific DRV line indicating a loaded disc with info
-                try:
-                    parts = line.split(',', 6) # Split by comma, expecting at least 7 parts for "D:" at the end
-                    if len(parts) > 5: # Title is the 6th part (index 5)
-                        title_part = parts[5]
-                        if title_part.startswith('\"') and title_part.endswith('\"'):
-                            disc_title_drv = title_part[1:-1]
-                            if disc_title_drv: # If we got a non-empty title from DRV, prioritize it
-                                print(f"Found disc title (from DRV line): {disc_title_drv}")
-                                return disc_title_drv 
-                except Exception as e:
-                    print(f"Error parsing DRV line for title: {line} - {e}")
-            
-            # If not found or DRV title was empty, try CINFO: line (e.g., CINFO:1,0,"METADATA_TITLE")
-            if line.startswith("CINFO:1,0,"): 
-                try:
-                    parts = line.split(',', 2)
-                    if len(parts) > 2:
-                        title_part = parts[2]
-                        if title_part.startswith('\"') and title_part.endswith('\"'):
-                            disc_title_cinfo = title_part[1:-1]
-                            # Don't return immediately, let DRV parsing complete if it hasn't found a title yet
-                except Exception as e:
-                    print(f"Error parsing CINFO line for title: {line.strip()} - {e}")
-
-        # After checking all lines, decide what to return
-        if disc_title_drv: # Should have been returned already if found and valid
-            # This case might be redundant if the earlier return works, but as a fallback.
-            print(f"Using disc title (from DRV line): {disc_title_drv}")
-            return disc_title_drv
-        elif disc_title_cinfo:
-            print(f"Found disc title (from CINFO line): {disc_title_cinfo}")
-            return disc_title_cinfo
-        else:
-            print("Could not determine disc title from makemkvcon info (checked DRV and CINFO).")
-            return None
+        print("Could not determine disc title from makemkvcon info (checked DRV and CINFO).")
+        return None
             
     except Exception as e:
         print(f"An error occurred while trying to get disc title: {e}")
         return None
 
+def show_rip_output(lines, last_progress):
+    """
+    Writes the MakeMKV output lines worth showing to stdout.
+    PRGV progress lines arrive many times a second, so only one is shown per PROGRESS_INTERVAL.
+    Returns the time the last progress line was shown.
+    """
+    shown = []
+    for line in lines:
+        if line.startswith(b"PRGV:"):
+            now = time.monotonic()
+            if now - last_progress < PROGRESS_INTERVAL:
+                continue
+            last_progress = now
+        elif line.startswith(HIDDEN_OUTPUT_PREFIXES):
+            continue
+        shown.append(line)
+    if shown:
+        sys.stdout.buffer.write(b"\n".join(shown) + b"\n")
+        sys.stdout.buffer.flush()
+    return last_progress
+
+def check_rip_prerequisites():
+    """
+    Checks that MakeMKV is installed and the output folder exists.
+    Neither changes between discs, so this runs once before the first rip.
+    Returns True if ripping can go ahead.
+    """
+    if not os.path.exists(makemkv):
+        print(f"Error: MakeMKV executable not found at '{makemkv}'. Please check the path.")
+        return False
+    try:
+        os.makedirs(output_folder, exist_ok=True)
+    except OSError as e:
+        print(f"Error creating output folder {output_folder}: {e}")
+        return False
+    return True
+
 def rip_and_eject():
     """
     Rips a specific title from the DVD, names it by disc title, and then ejects the drive.
@@ -125,10 +153,6 @@ def rip_and_eject():
 
     print(f"Attempting to rip title {title_to_rip} from {makemkv_drive_specifier} to {final_output_path}")
 
-    if not os.path.exists(makemkv):
-        print(f"Error: MakeMKV executable not found at '{makemkv}'. Please check the path.")
-        return
-
     # Ensure output directory (including title-specific subfolder) exists
     try:
         if not os.path.exists(final_output_path):
@@ -156,13 +180,19 @@ def rip_and_eject():
             command,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT, # Combine stdout and stderr
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            bufsize=0 # Unbuffered bytes; output is forwarded as it arrives
         ) as proc:
             print("\\n--- MakeMKV Rip Output Start ---")
-            for line in proc.stdout:
-                print(line, end="") # Print MakeMKV output directly
+            sys.stdout.flush() # Keep our own messages ahead of the raw output
+            # Output is filtered as bytes, without decoding it
+            tail = b""
+            last_progress = 0.0
+            for chunk in iter(lambda: proc.stdout.read(65536), b""):
+                lines = (tail + chunk).split(b"\n")
+                tail = lines.pop() # Unfinished last line; the next chunk completes it
+                last_progress = show_rip_output(lines, last_progress)
+            if tail:
+                show_rip_output([tail], last_progress)
             print("\\n--- MakeMKV Rip Output End (stdout loop finished) ---") # Added this line
 
             print("Waiting for MakeMKV process to terminate...") # Added this line
@@ -181,32 +211,73 @@ def rip_and_eject():
                         ctypes.windll.WINMM.mciSendStringW(eject_command, None, 0, None)
                         ctypes.windll.WINMM.mciSendStringW(close_alias_command, None, 0, None)
                         print(f"Eject command sent to drive {drive_letter}.")
-                        send_pushbullet_notification("DVD Rip Success", f"DVD '{current_disc_title if current_disc_title else 'Unknown Disc'}' ripped successfully and disc ejected from drive {drive_letter}.", PUSHBULLET_API_KEY)
+                        queue_notification("DVD Rip Success", f"DVD '{current_disc_title if current_disc_title else 'Unknown Disc'}' ripped successfully and disc ejected from drive {drive_letter}.")
                     else:
                         print(f"Failed to open or alias drive {drive_letter} for eject.")
-                        send_pushbullet_notification("DVD Rip Alert", f"DVD '{current_disc_title if current_disc_title else 'Unknown Disc'}' ripped successfully, but failed to eject drive {drive_letter}.", PUSHBULLET_API_KEY)
+                        queue_notification("DVD Rip Alert", f"DVD '{current_disc_title if current_disc_title else 'Unknown Disc'}' ripped successfully, but failed to eject drive {drive_letter}.")
                 except Exception as e_eject:
                     print(f"Could not eject drive {drive_letter}: {e_eject}")
-                    send_pushbullet_notification("DVD Rip Error", f"DVD '{current_disc_title if current_disc_title else 'Unknown Disc'}' ripped successfully, but an error occurred during eject: {e_eject}", PUSHBULLET_API_KEY)
+                    queue_notification("DVD Rip Error", f"DVD '{current_disc_title if current_disc_title else 'Unknown Disc'}' ripped successfully, but an error occurred during eject: {e_eject}")
             else:
                 print("\\nRip failed. Drive will not be ejected.")
-                send_pushbullet_notification("DVD Rip Failed", f"MakeMKV rip failed for '{current_disc_title if current_disc_title else 'Unknown Disc'}' with error code {proc.returncode}. Drive not ejected.", PUSHBULLET_API_KEY)
+                queue_notification("DVD Rip Failed", f"MakeMKV rip failed for '{current_disc_title if current_disc_title else 'Unknown Disc'}' with error code {proc.returncode}. Drive not ejected.")
 
     except FileNotFoundError: # Should be caught by the os.path.exists check
         print(f"Error: MakeMKV executable not found at '{makemkv}'.")
-        send_pushbullet_notification("Script Error", f"MakeMKV executable not found at '{makemkv}'.", PUSHBULLET_API_KEY)
+        queue_notification("Script Error", f"MakeMKV executable not found at '{makemkv}'.")
         return
     except Exception as e:
         print(f"An error occurred during MakeMKV execution: {e}")
-        send_pushbullet_notification("Script Error", f"An error occurred during MakeMKV execution: {e}", PUSHBULLET_API_KEY)
+        queue_notification("Script Error", f"An error occurred during MakeMKV execution: {e}")
         return
 
+def get_volume_label(drive):
+    """
+    Returns the volume label of the disc mounted in drive, or None if the drive is empty.
+    """
+    label = ctypes.create_unicode_buffer(256)
+    if ctypes.windll.kernel32.GetVolumeInformationW(drive, label, 256, None, None, None, None, 0):
+        return label.value
+    return None
+
+def wait_for_disc(drive=drive_letter + "\\", poll=1.0, stop_event=None):
+    """
+    Waits for the current disc to leave the drive and a new one to be mounted.
+    Returns the new volume label, or None if stop_event is set first.
+    """
+    # A disc that failed to rip is still in the drive; don't pick it up again
+    old_disc_removed = False
+    while not (stop_event and stop_event.is_set()):
+        label = get_volume_label(drive)
+        if label is None:
+            old_disc_removed = True
+        elif old_disc_removed:
+            return label
+        time.sleep(poll)
+    return None
+
+def watch_for_quit(stop_event):
+    """
+    Sets stop_event once the user types 'Q' and presses Enter.
+    """
+    for line in sys.stdin:
+        if line.strip().upper() == 'Q':
+            stop_event.set()
+            return
+
 if __name__ == "__main__":
-    while True:
-        rip_and_eject()
-        print("\\nProcess complete for the current disc.")
-        user_input = input("Insert the next DVD and press Enter to continue, or type 'Q' and press Enter to quit: ")
-        if user_input.strip().upper() == 'Q':
-            print("Exiting script.")
-            break
-        print("\\nStarting process for the next disc...")
+    if not check_rip_prerequisites():
+        sys.exit(1)
+    stop_event = threading.Event()
+    threading.Thread(target=watch_for_quit, args=(stop_event,), daemon=True).start()
+    try:
+        while not stop_event.is_set():
+            rip_and_eject()
+            print("\\nProcess complete for the current disc.")
+            print("Insert the next DVD to continue, or type 'Q' and press Enter to quit.")
+            if wait_for_disc(stop_event=stop_event) is None:
+                break
+            print("\\nStarting process for the next disc...")
+    except KeyboardInterrupt:
+        pass
+    print("Exiting script.")
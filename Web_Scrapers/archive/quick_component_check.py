@@ -3,6 +3,7 @@
 Simple test to verify our Phase 1 & 2 components
 """
 
+import re
 import sys
 import os
 from pathlib import Path
@@ -46,13 +47,16 @@ try:
     rom_downloader_path = Path(__file__).parent.parent / 'rom_downloader_enhanced.py'
     with open(rom_downloader_path, 'r', encoding='utf-8') as f:
         content = f.read()
+    
+    # Look for all integration markers in a single pass over the source
+    found = set(re.findall(r'get_enhanced_random_headers|proxy_used|direct_used', content))
         
-    if 'get_enhanced_random_headers' in content:
+    if 'get_enhanced_random_headers' in found:
         print("✅ Enhanced ROM downloader: Phase 2 integration detected")
     else:
         print("❌ Enhanced ROM downloader: Phase 2 integration not found")
         
-    if 'proxy_used' in content and 'direct_used' in content:
+    if 'proxy_used' in found and 'direct_used' in found:
         print("✅ Enhanced ROM downloader: Phase 1 proxy tracking detected")
     else:
         print("❌ Enhanced ROM downloader: Phase 1 proxy tracking not found")
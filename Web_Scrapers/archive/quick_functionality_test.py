@@ -6,10 +6,17 @@
 Tests Phase 1 & 2 implementations without relying on finding working proxies.
 """
 
+import re
 import sys
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
+# Pooled session so repeated probes reuse the same connection
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=1))
+SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=1))
+
 # Add the working_scrapers directory to path
 sys.path.append(str(Path(__file__).parent.parent / "working_scrapers"))
 
@@ -81,7 +88,7 @@ def test_direct_connection():
     
     try:
         # Test with httpbin to see our current IP
-        response = requests.get('http://httpbin.org/ip', timeout=10)
+        response = SESSION.get('http://httpbin.org/ip', timeout=10)
         if response.status_code == 200:
             data = response.json()
             ip = data.get('origin', 'Unknown')
@@ -118,8 +125,14 @@ def test_rom_downloader_integration():
             'randomize'
         ]
         
-        phase1_found = sum(1 for feature in phase1_features if feature in content)
-        phase2_found = sum(1 for feature in phase2_features if feature in content)
+        # Scan the source once for every feature name (lookahead allows overlaps)
+        feature_pattern = re.compile(
+            '(?=(' + '|'.join(map(re.escape, phase1_features + phase2_features)) + '))'
+        )
+        found_features = set(feature_pattern.findall(content))
+        
+        phase1_found = sum(1 for feature in phase1_features if feature in found_features)
+        phase2_found = sum(1 for feature in phase2_features if feature in found_features)
         
         print(f"Phase 1 integration: {phase1_found}/{len(phase1_features)} features found")
         print(f"Phase 2 integration: {phase2_found}/{len(phase2_features)} features found")
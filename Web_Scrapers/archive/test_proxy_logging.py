@@ -4,13 +4,49 @@ Quick test to verify ROM downloader proxy logging and rotation
 """
 
 import asyncio
+import json
 import sys
+import time
 from pathlib import Path
 
 # Add the parent directory to path to import rom_downloader
 sys.path.append(str(Path(__file__).parent.parent))
 
 from rom_downloader import ROMDownloader
+from working_scrapers.modern_proxy_scraper import ModernProxyRotator
+
+# Working proxies found by an earlier run are reused while still fresh
+PROXY_CACHE_PATH = Path.home() / '.cache' / 'proxy_logging_test' / 'proxies.json'
+PROXY_CACHE_TTL = 15 * 60  # seconds
+_cached_rotator = None
+
+async def get_rotator(proxy_count=3):
+    """Return a shared proxy rotator, loading proxies from the cache file when fresh"""
+    global _cached_rotator
+    if _cached_rotator is not None:
+        return _cached_rotator
+    
+    rotator = ModernProxyRotator(proxy_count=proxy_count, timeout=5)
+    try:
+        cache = json.loads(PROXY_CACHE_PATH.read_text(encoding='utf-8'))
+        if time.time() - cache['saved_at'] < PROXY_CACHE_TTL:
+            rotator.proxies = cache['proxies'][:proxy_count]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    if rotator.proxies:
+        print(f"♻️  Loaded {len(rotator.proxies)} proxies from {PROXY_CACHE_PATH.name}")
+    else:
+        await rotator.find_proxies_async()
+        if rotator.proxies:
+            PROXY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            PROXY_CACHE_PATH.write_text(
+                json.dumps({'saved_at': time.time(), 'proxies': rotator.proxies}),
+                encoding='utf-8'
+            )
+    
+    _cached_rotator = rotator
+    return rotator
 
 async def test_proxy_logging():
     """Test proxy logging and rotation"""
@@ -30,14 +66,11 @@ async def test_proxy_logging():
     
     # Test proxy initialization
     print("\n🔍 Testing proxy discovery...")
-    from working_scrapers.modern_proxy_scraper import ModernProxyRotator
-    
-    proxy_rotator = ModernProxyRotator(proxy_count=3, timeout=5)
-    downloader.proxy_rotator = proxy_rotator
-    
     try:
-        # Find a few proxies quickly
-        proxies = await proxy_rotator.find_proxies_async()
+        # Find a few proxies quickly (or reuse the ones found last run)
+        proxy_rotator = await get_rotator(proxy_count=3)
+        downloader.proxy_rotator = proxy_rotator
+        proxies = proxy_rotator.proxies
         print(f"✅ Found {len(proxies)} working proxies")
         
         if proxies:
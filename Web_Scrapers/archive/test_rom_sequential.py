@@ -4,6 +4,7 @@ Quick test of the updated ROM downloader with sequential downloads
 """
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from rom_downloader import ROMDownloader
 
 async def test_rom_downloader():
@@ -27,11 +28,12 @@ async def test_rom_downloader():
     rom_files = downloader.find_rom_files()
     if rom_files:
         print(f"\n📁 Found ROM collections:")
+        # Parse every file up front in parallel, then report per console
+        all_files = [file_path for files in rom_files.values() for file_path in files]
+        with ThreadPoolExecutor() as executor:
+            parsed = dict(zip(all_files, executor.map(downloader.parse_rom_file, all_files)))
         for console, files in rom_files.items():
-            total_roms = 0
-            for file_path in files:
-                roms = downloader.parse_rom_file(file_path)
-                total_roms += len(roms)
+            total_roms = sum(len(parsed[file_path]) for file_path in files)
             print(f"  🎯 {console}: {len(files)} files, ~{total_roms} ROMs")
     else:
         print("❌ No ROM files found")
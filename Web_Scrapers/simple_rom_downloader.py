@@ -19,22 +19,71 @@ import asyncio
 import aiohttp
 import aiofiles
 import logging
+import re
+from contextlib import aclosing
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict
+from typing import List
 from urllib.parse import urlparse, unquote
 from tqdm.asyncio import tqdm
 import time
 
-# Configure logging
+# aiodns lets aiohttp resolve hostnames without blocking a thread per lookup
+try:
+    import aiodns  # noqa: F401
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+# Configure logging - per-ROM details go to the log file only, the console
+# shows warnings and errors while tqdm reports progress
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.WARNING)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('simple_rom_downloader.log', encoding='utf-8'),
-        logging.StreamHandler()
+        console_handler
     ]
 )
 
+# A ROM entry is a name line followed by its URL line (blank lines allowed between)
+ROM_ENTRY_PATTERN = re.compile(
+    r'^[ \t]*(?!http)(\S[^\r\n]*?)[ \t]*\r?\n(?:[ \t]*\r?\n)*[ \t]*(http[^\r\n]*?)[ \t]*$',
+    re.MULTILINE
+)
+
+# Characters that are not allowed in Windows filenames
+FILENAME_TRANSLATION = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
+# Error pages served as application/octet-stream still start like HTML
+HTML_SIGNATURES = (b'<!doctype', b'<html')
+
+def iter_rom_list_files(root_dir: str):
+    """Yield (path, console) for every .txt file below root_dir"""
+    pending = [root_dir]
+    while pending:
+        # Like Path.rglob, a missing or unreadable directory yields nothing
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith('.txt'):
+                    yield entry.path, os.path.basename(os.path.dirname(entry.path))
+
+@dataclass(slots=True)
+class Rom:
+    """A single ROM entry parsed from a ROM list file"""
+    name: str
+    url: str
+    console: str
+    local_filename: str
+
 class SimpleRomDownloader:
     """Simple ROM downloader without proxy complexity"""
     
@@ -42,52 +91,44 @@ class SimpleRomDownloader:
         self.logger = logging.getLogger(__name__)
         self.session_timeout = aiohttp.ClientTimeout(total=300, connect=30)
         self.max_concurrent = 3  # Conservative to avoid overwhelming servers
+        self._created_dirs = set()  # Console directories already created this run
         
-    def parse_rom_files(self, rom_files_dir: str) -> List[Dict]:
-        """Parse ROM files to extract download information"""
+    async def iter_rom_files(self, rom_files_dir: str):
+        """Yield ROMs file by file so downloads can start before parsing finishes"""
+        for file_path, console in iter_rom_list_files(rom_files_dir):
+            for rom in await asyncio.to_thread(self._parse_rom_file, file_path, console):
+                yield rom
+    
+    def _parse_rom_file(self, file_path: str, console: str) -> List[Rom]:
+        """Parse a single ROM list file"""
         roms = []
-        rom_dir = Path(rom_files_dir)
-        
-        for file_path in rom_dir.rglob("*.txt"):
-            try:
-                current_name = None
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                            
-                        if line.startswith('http'):
-                            if current_name:
-                                roms.append({
-                                    'name': current_name,
-                                    'url': line,
-                                    'console': file_path.parent.name,
-                                    'local_filename': self.sanitize_filename(current_name)
-                                })
-                                current_name = None
-                        else:
-                            current_name = line
-                            
-            except Exception as e:
-                self.logger.error(f"Error parsing {file_path}: {e}")
-                
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            for name, url in ROM_ENTRY_PATTERN.findall(text):
+                roms.append(Rom(
+                    name=name,
+                    url=url,
+                    console=console,
+                    local_filename=self.sanitize_filename(name)
+                ))
+        except Exception as e:
+            self.logger.error("Error parsing %s: %s", file_path, e)
         return roms
     
     def sanitize_filename(self, filename: str) -> str:
         """Clean filename for safe storage"""
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        return filename
+        return filename.translate(FILENAME_TRANSLATION)
     
-    def get_download_path(self, rom: Dict, output_dir: Path) -> Path:
+    def get_download_path(self, rom: Rom, output_dir: Path) -> Path:
         """Get the full download path for a ROM"""
-        console_dir = output_dir / rom['console']
-        console_dir.mkdir(parents=True, exist_ok=True)
-        return console_dir / rom['local_filename']
+        console_dir = output_dir / rom.console
+        if console_dir not in self._created_dirs:
+            console_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(console_dir)
+        return console_dir / rom.local_filename
     
-    async def download_rom(self, rom: Dict, output_dir: Path, session: aiohttp.ClientSession, 
+    async def download_rom(self, rom: Rom, output_dir: Path, session: aiohttp.ClientSession, 
                           overall_pbar: tqdm = None) -> bool:
         """Download a single ROM with progress tracking"""
         download_path = self.get_download_path(rom, output_dir)
@@ -96,40 +137,82 @@ class SimpleRomDownloader:
         if download_path.exists():
             file_size = download_path.stat().st_size
             if file_size > 1000:  # More than 1KB, likely not an error page
-                print(f"✅ Already downloaded: {rom['name']} ({file_size:,} bytes)")
+                self.logger.info("Already downloaded: %s (%d bytes)", rom.name, file_size)
                 if overall_pbar:
                     overall_pbar.update(1)
                 return True
         
+        # Partial data is kept next to the final file so retries can resume it
+        partial_path = download_path.with_name(download_path.name + '.part')
+        resume_from = partial_path.stat().st_size if partial_path.exists() else 0
+        request_headers = {'Range': f'bytes={resume_from}-'} if resume_from else None
+        
         try:
-            print(f"🎮 Downloading: {rom['name']}")
+            self.logger.info("Downloading: %s", rom.name)
             start_time = time.time()
             
-            async with session.get(rom['url']) as response:
-                if response.status != 200:
-                    self.logger.error(f"HTTP {response.status} for {rom['name']}")
+            async with session.get(rom.url, headers=request_headers) as response:
+                # 416 means nothing is left after the partial data, e.g. the
+                # run stopped before the .part file was renamed
+                if response.status == 416 and resume_from:
+                    complete_size = response.headers.get('Content-Range', '').rpartition('/')[2]
+                    if complete_size == str(resume_from):
+                        partial_path.replace(download_path)
+                        self.logger.info("Finished earlier download: %s (%d bytes)", rom.name, resume_from)
+                        if overall_pbar:
+                            overall_pbar.update(1)
+                        return True
+                    
+                    # The partial data doesn't match the file any more; start over
+                    self.logger.warning("Discarding partial download of %s", rom.name)
+                    partial_path.unlink(missing_ok=True)
+                    response.release()
+                    return await self.download_rom(rom, output_dir, session, overall_pbar)
+                
+                if response.status not in (200, 206):
+                    self.logger.error("HTTP %s for %s", response.status, rom.name)
                     return False
                 
                 # Check content type
                 content_type = response.headers.get('content-type', '').lower()
                 if 'text/html' in content_type:
-                    self.logger.error(f"Got HTML instead of ROM file for {rom['name']}")
+                    self.logger.error("Got HTML instead of ROM file for %s", rom.name)
                     return False
                 
+                # A plain 200 means the server ignored the Range header
+                if response.status != 206:
+                    resume_from = 0
+                elif resume_from:
+                    self.logger.info("Resuming %s from %d bytes", rom.name, resume_from)
+                
+                # Sniff the start of a fresh download for a mislabelled HTML page
+                first_chunk = b''
+                if not resume_from:
+                    try:
+                        first_chunk = await response.content.readexactly(512)
+                    except asyncio.IncompleteReadError as e:
+                        first_chunk = e.partial
+                    if first_chunk.lstrip().lower().startswith(HTML_SIGNATURES):
+                        self.logger.error("Got HTML instead of ROM file for %s", rom.name)
+                        return False
+                
                 total_size = int(response.headers.get('content-length', 0))
                 
                 # Create progress bar for this download
                 progress_bar = tqdm(
-                    total=total_size,
+                    total=resume_from + total_size,
+                    initial=resume_from,
                     unit='B',
                     unit_scale=True,
                     unit_divisor=1024,
-                    desc=f"📥 {rom['name'][:30]}"
+                    desc=f"📥 {rom.name[:30]}"
                 )
                 
-                downloaded = 0
-                async with aiofiles.open(download_path, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(8192):
+                downloaded = resume_from + len(first_chunk)
+                progress_bar.update(len(first_chunk))
+                async with aiofiles.open(partial_path, 'ab' if resume_from else 'wb') as f:
+                    await f.write(first_chunk)
+                    async for chunk in response.content.iter_any():
                         await f.write(chunk)
                         downloaded += len(chunk)
                         progress_bar.update(len(chunk))
@@ -139,15 +222,17 @@ class SimpleRomDownloader:
                 # Calculate download stats
                 end_time = time.time()
                 download_time = end_time - start_time
-                speed = downloaded / download_time if download_time > 0 else 0
+                speed = (downloaded - resume_from) / download_time if download_time > 0 else 0
                 
                 # Validate the download
                 if downloaded < 1000:  # Likely an error page
-                    self.logger.error(f"Download too small for {rom['name']}: {downloaded} bytes")
-                    download_path.unlink(missing_ok=True)
+                    self.logger.error("Download too small for %s: %d bytes", rom.name, downloaded)
+                    partial_path.unlink(missing_ok=True)
                     return False
                 
-                print(f"✅ Downloaded: {rom['name']} ({downloaded:,} bytes, {speed/1024/1024:.2f} MB/s)")
+                partial_path.replace(download_path)
+                
+                self.logger.info("Downloaded: %s (%d bytes, %.2f MB/s)", rom.name, downloaded, speed / 1024 / 1024)
                 
                 if overall_pbar:
                     overall_pbar.update(1)
@@ -155,66 +240,94 @@ class SimpleRomDownloader:
                 return True
                 
         except asyncio.TimeoutError:
-            self.logger.error(f"Timeout downloading {rom['name']}")
+            self.logger.error("Timeout downloading %s", rom.name)
             return False
         except Exception as e:
-            self.logger.error(f"Error downloading {rom['name']}: {e}")
+            self.logger.error("Error downloading %s: %s", rom.name, e)
             return False
     
     async def download_roms(self, rom_files_dir: str, output_dir: str, max_downloads: int = None):
         """Download ROMs with concurrent processing"""
-        roms = self.parse_rom_files(rom_files_dir)
-        
-        if not roms:
-            print("❌ No ROMs found to download")
-            return
-        
-        if max_downloads:
-            roms = roms[:max_downloads]
-        
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        print(f"🎮 Found {len(roms)} ROMs to download")
         print(f"📁 Download directory: {output_path.absolute()}")
         
-        # Create overall progress bar
-        overall_pbar = tqdm(total=len(roms), desc="🎮 Overall Progress", unit="ROM")
+        # Create overall progress bar; its total grows as ROM files are parsed
+        overall_pbar = tqdm(total=0, desc="🎮 Overall Progress", unit="ROM")
         
         # Create session with direct connection (no proxies)
+        # Keep-alive sockets are reused across ROMs; the worker pool below
+        # still bounds how many downloads run at once.
+        resolver = aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None
         connector = aiohttp.TCPConnector(
-            limit=self.max_concurrent,
-            limit_per_host=2,
-            keepalive_timeout=30,
-            enable_cleanup_closed=True
+            resolver=resolver,
+            limit=0,
+            limit_per_host=self.max_concurrent,
+            force_close=False,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True,
+            use_dns_cache=True,
+            ttl_dns_cache=600
         )
         
         async with aiohttp.ClientSession(
             connector=connector,
             timeout=self.session_timeout,
+            read_bufsize=1024 * 1024,
+            # ROMs are already compressed; ask for raw bytes and skip zlib
+            auto_decompress=False,
             headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                'Accept-Encoding': 'identity'
             }
         ) as session:
             
-            # Process downloads with semaphore for rate limiting
-            semaphore = asyncio.Semaphore(self.max_concurrent)
+            # A fixed pool of workers pulls ROMs from a bounded queue for rate
+            # limiting; None tells a worker that parsing has finished
+            queue = asyncio.Queue(maxsize=self.max_concurrent * 4)
+            results = []
             
-            async def download_with_semaphore(rom):
-                async with semaphore:
-                    return await self.download_rom(rom, output_path, session, overall_pbar)
+            async def worker():
+                while True:
+                    rom = await queue.get()
+                    if rom is None:
+                        return
+                    try:
+                        results.append(await self.download_rom(rom, output_path, session, overall_pbar))
+                    except Exception as e:
+                        self.logger.error("Unexpected error downloading %s: %s", rom.name, e)
+                        results.append(False)
             
-            # Execute downloads
-            tasks = [download_with_semaphore(rom) for rom in roms]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Start downloading while the ROM files are still being parsed
+            workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrent)]
+            queued = 0
+            try:
+                # aclosing finishes the parser right away if we stop early
+                async with aclosing(self.iter_rom_files(rom_files_dir)) as roms:
+                    async for rom in roms:
+                        overall_pbar.total = queued = queued + 1
+                        overall_pbar.refresh()
+                        await queue.put(rom)
+                        if max_downloads and queued >= max_downloads:
+                            break
+            finally:
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
             
             overall_pbar.close()
             
+            if not queued:
+                print("❌ No ROMs found to download")
+                return
+            
             # Summary
             successful = sum(1 for r in results if r is True)
             failed = len(results) - successful
             
             print(f"\n🎮 Download Summary:")
+            print(f"🎮 ROMs found: {queued}")
             print(f"✅ Successful: {successful}")
             print(f"❌ Failed: {failed}")
             print(f"📁 Downloads saved to: {output_path.absolute()}")
@@ -11,53 +11,69 @@ import os
 import sys
 import re
 from pathlib import Path
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import argparse
+from collections import Counter
+
+# Common error indicators, reported in this order
+ERROR_PATTERNS = [
+    'access denied',
+    'forbidden',
+    'not found',
+    'error',
+    'blocked',
+    'captcha',
+    'cloudflare',
+    'sorry',
+    'unavailable',
+    'throttl',
+    'limit',
+    'protect'
+]
+ERROR_PATTERN_RE = re.compile('|'.join(ERROR_PATTERNS), re.IGNORECASE)
+
+# Only the tags the analysis looks at; scripts and styles are never parsed
+ERROR_PAGE_TAGS = ['title', 'meta', 'div', 'p', 'span', 'h1', 'h2', 'h3', 'h4']
+ERROR_PAGE_STRAINER = SoupStrainer(ERROR_PAGE_TAGS)
+ERROR_CLASS_RE = re.compile(r'error|alert|message|notification', re.I)
+REFRESH_RE = re.compile(r'refresh', re.I)
+
+# Error indicators almost always appear near the top of the page
+HTML_HEAD_BYTES = 64 * 1024
 
 def analyze_html_file(file_path):
     """Analyze an HTML file to extract useful information about the error"""
     print(f"\n🔍 Analyzing HTML file: {file_path}")
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            html_content = f.read()
+        # Only read the rest of the file if the head has no error indicators
+        with open(file_path, 'rb') as f:
+            raw_content = f.read(HTML_HEAD_BYTES)
+            if not ERROR_PATTERN_RE.search(raw_content.decode('utf-8', errors='ignore')):
+                raw_content += f.read()
+        html_content = raw_content.decode('utf-8', errors='ignore')
         
-        # Use BeautifulSoup to parse HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Use BeautifulSoup with the C-based lxml parser
+        soup = BeautifulSoup(html_content, 'lxml', parse_only=ERROR_PAGE_STRAINER)
         
         # Extract key information
         title = soup.title.text if soup.title else "No title found"
         print(f"📄 Page Title: {title}")
         
-        # Look for common error messages
-        error_patterns = [
-            r'access denied',
-            r'forbidden',
-            r'not found',
-            r'error',
-            r'blocked',
-            r'captcha',
-            r'cloudflare',
-            r'sorry',
-            r'unavailable',
-            r'throttl',
-            r'limit',
-            r'protect'
-        ]
-        
+        # Look for common error messages in a single scan
         print("\n🔎 Searching for error indicators:")
+        counts = Counter(match.lower() for match in ERROR_PATTERN_RE.findall(html_content))
         found_patterns = set()
-        for pattern in error_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            if matches:
-                print(f"✓ Found '{pattern}' ({len(matches)} occurrences)")
+        for pattern in ERROR_PATTERNS:
+            if counts[pattern]:
+                print(f"✓ Found '{pattern}' ({counts[pattern]} occurrences)")
                 found_patterns.add(pattern)
         
         if not found_patterns:
             print("No common error patterns found")
         
         # Check for redirects
-        meta_refresh = soup.find('meta', attrs={'http-equiv': re.compile(r'refresh', re.I)})
+        meta_refresh = soup.find('meta', attrs={'http-equiv': REFRESH_RE})
         if meta_refresh:
             print(f"\n↪️ Found meta refresh redirect: {meta_refresh.get('content')}")
         
@@ -69,7 +85,7 @@ def analyze_html_file(file_path):
         # Extract potential error messages
         print("\n📝 Potential error messages:")
         error_containers = soup.find_all(['div', 'p', 'span', 'h1', 'h2', 'h3', 'h4'], 
-                                        class_=re.compile(r'error|alert|message|notification', re.I))
+                                        class_=ERROR_CLASS_RE)
         
         if error_containers:
             for container in error_containers[:5]:  # Limit to first 5 to avoid too much output
@@ -7,24 +7,96 @@ This tool helps find alternative download sources for ROMs
 when the primary source is not working.
 """
 
-import requests
+import asyncio
+import aiohttp
+import httpx
 import sys
-from urllib.parse import unquote, quote
+from urllib.parse import unquote, quote, urlparse
+from collections import defaultdict
 import re
+import shelve
 import time
+from pathlib import Path
+from types import MappingProxyType
 
-def test_url(url, show_headers=False):
-    """Test if a URL is accessible and what type of content it returns"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://myrient.erista.me/'
-    }
-    
+# HTTP/2 needs the h2 package (pip install httpx[http2]); otherwise use HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# aiodns is optional; aiohttp falls back to its threaded resolver
+try:
+    import aiodns  # noqa: F401
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+# Brotli decoding needs the brotli package; only advertise br when it's present
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+DEFAULT_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+    'Referer': 'https://myrient.erista.me/'
+})
+
+DOMAIN_RE = re.compile(r'https?://([^/]+)')
+TITLE_RE = re.compile(r'<title>(.*?)</title>', re.IGNORECASE)
+ROM_ARCHIVE_EXT_RE = re.compile(r'\.(zip|7z|rar)$', re.IGNORECASE)
+
+# ETag/Last-Modified validators and the last result for each checked URL
+URL_CACHE_PATH = Path.home() / '.cache' / 'rom_url_checker' / 'url_check'
+
+def open_url_cache():
+    """Open the URL validator cache, creating its directory on first use"""
+    URL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    return shelve.open(str(URL_CACHE_PATH))
+
+def conditional_headers(validators):
+    """Build If-None-Match/If-Modified-Since headers from cached validators"""
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+def test_url(client, cache, url, show_headers=False):
+    """
+    Test if a URL is accessible and what type of content it returns
+    client is the run's httpx.Client and cache its open URL validator cache
+    """
     try:
-        response = requests.get(url, headers=headers, timeout=10, stream=True)
-        content_type = response.headers.get('content-type', 'unknown')
+        cached = cache.get(url, {})
+        revalidate = conditional_headers(cached) if cached.get('result') else {}
+        
+        # HEAD classifies most URLs without transferring any body bytes
+        response = client.head(url, headers=revalidate)
+        if response.status_code == 304:
+            return cached['result']
+        content_type = response.headers.get('content-type')
+        content_preview = ""
+        
+        # Servers that refuse HEAD, or HTML pages we want a preview of, get a streamed GET
+        if response.status_code in (405, 501) or not content_type or 'text/html' in content_type:
+            with client.stream('GET', url, headers=revalidate) as response:
+                if response.status_code == 304:
+                    return cached['result']
+                content_type = response.headers.get('content-type')
+                
+                # Only HTML responses get a preview; leave binary bodies unread
+                if content_type and 'text/html' in content_type:
+                    content_preview = next(response.iter_bytes(chunk_size=1024), b"").decode('utf-8', errors='ignore')
+        
+        content_type = content_type or 'unknown'
         
         if show_headers:
             print("\nResponse Headers:")
@@ -33,16 +105,21 @@ def test_url(url, show_headers=False):
         
         is_html = 'text/html' in content_type
         
-        # Read a small chunk to check content
-        content_preview = next(response.iter_content(chunk_size=1024), b"").decode('utf-8', errors='ignore')
-        
-        return {
+        result = {
             'status': response.status_code,
             'content_type': content_type,
             'is_html': is_html,
             'content_preview': content_preview if is_html else "[BINARY DATA]",
             'success': response.status_code == 200 and not is_html
         }
+        
+        # Remember validators so the next check can be answered with a 304
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if response.status_code == 200 and (etag or last_modified):
+            cache[url] = {'etag': etag, 'last_modified': last_modified, 'result': result}
+        
+        return result
     
     except Exception as e:
         return {
@@ -53,7 +130,45 @@ def test_url(url, show_headers=False):
             'success': False
         }
 
-def find_alternative_sources(rom_name):
+# Minimum spacing between requests to the same host
+MIN_HOST_GAP = 1.0
+_next_host_slot = defaultdict(float)
+
+async def wait_for_host(host):
+    """Reserve the next request slot for host and sleep until it opens"""
+    now = time.monotonic()
+    slot = max(now, _next_host_slot[host])
+    _next_host_slot[host] = slot + MIN_HOST_GAP
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+async def check_domain(session, domain, search_term):
+    """Check one alternative domain and return the report lines for it"""
+    lines = [f"\nChecking {domain}..."]
+    
+    if domain == "archive.org":
+        # For archive.org, we'll check the Internet Archive's ROM collections
+        search_url = f"https://archive.org/search?query={quote(search_term)}+gamecube"
+        
+        try:
+            await wait_for_host(urlparse(search_url).netloc)
+            async with session.get(search_url) as response:
+                text = await response.text()
+            if "No results matched your criteria" not in text:
+                lines.append(f"✅ Potential matches found on {domain}.")
+                lines.append(f"🔗 Search URL: {search_url}")
+            else:
+                lines.append(f"❌ No matches found on {domain}.")
+        except Exception as e:
+            lines.append(f"❌ Error searching {domain}: {e}")
+    
+    else:
+        # For other ROM sites
+        lines.append(f"🔗 Visit {domain} and search for \"{search_term}\"")
+    
+    return lines
+
+async def find_alternative_sources(rom_name):
     """Try to find alternative sources for the ROM"""
     # List of ROM sites to check
     alt_domains = [
@@ -67,26 +182,20 @@ def find_alternative_sources(rom_name):
     
     print(f"\n🔍 Searching for alternative sources for: {search_term}")
     
-    for domain in alt_domains:
-        if domain == "archive.org":
-            # For archive.org, we'll check the Internet Archive's ROM collections
-            search_url = f"https://archive.org/search?query={quote(search_term)}+gamecube"
-            print(f"\nChecking {domain}...")
-            
-            try:
-                response = requests.get(search_url)
-                if "No results matched your criteria" not in response.text:
-                    print(f"✅ Potential matches found on {domain}.")
-                    print(f"🔗 Search URL: {search_url}")
-                else:
-                    print(f"❌ No matches found on {domain}.")
-            except Exception as e:
-                print(f"❌ Error searching {domain}: {e}")
-        
-        else:
-            # For other ROM sites
-            print(f"\nChecking {domain}...")
-            print(f"🔗 Visit {domain} and search for \"{search_term}\"")
+    # Check every domain concurrently, then report in the original order
+    resolver = aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None
+    connector = aiohttp.TCPConnector(resolver=resolver, use_dns_cache=True, ttl_dns_cache=300,
+                                     limit=len(alt_domains))
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS,
+                                     timeout=timeout) as session:
+        reports = await asyncio.gather(
+            *(check_domain(session, domain, search_term) for domain in alt_domains)
+        )
+    
+    for lines in reports:
+        for line in lines:
+            print(line)
     
     print("\n⚠️ IMPORTANT LEGAL NOTICE:")
     print("This tool only helps identify if ROMs are available. Please ensure you")
@@ -109,14 +218,14 @@ def check_rom_url_format(url):
     
     # Check for common domain typos
     common_domains = ['myrient.erista.me', 'archive.org', 'wowroms.com']
-    domain_match = re.search(r'https?://([^/]+)', url)
+    domain_match = DOMAIN_RE.search(url)
     if domain_match:
         domain = domain_match.group(1)
         if domain not in common_domains and any(d in domain for d in common_domains):
             issues.append(f"Domain {domain} might have a typo")
     
     # Check file extension
-    if not url.endswith('.zip') and not url.endswith('.7z') and not url.endswith('.rar'):
+    if not ROM_ARCHIVE_EXT_RE.search(url):
         issues.append("URL doesn't end with a common ROM archive extension (.zip, .7z, .rar)")
     
     if issues:
@@ -149,7 +258,20 @@ def main():
     
     # Test the URL
     print("\n🔍 Testing direct access to URL...")
-    result = test_url(url, show_headers=True)
+    # One client for the run; with HTTP/2 every check against a host rides
+    # one connection
+    client = httpx.Client(
+        headers=DEFAULT_HEADERS,
+        timeout=10,
+        follow_redirects=True,
+        transport=httpx.HTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+        )
+    )
+    with client, open_url_cache() as cache:
+        result = test_url(client, cache, url, show_headers=True)
     
     if result['success']:
         print(f"✅ URL is accessible and returns binary content!")
@@ -165,12 +287,12 @@ def main():
             print(result['content_preview'][:200] + "...")
             
             # Extract title if present
-            title_match = re.search(r'<title>(.*?)</title>', result['content_preview'], re.IGNORECASE)
+            title_match = TITLE_RE.search(result['content_preview'])
             if title_match:
                 print(f"\n📑 Page Title: {title_match.group(1)}")
         
         # Find alternative sources
-        find_alternative_sources(rom_name)
+        asyncio.run(find_alternative_sources(rom_name))
     
     print("\n📝 Recommendations:")
     print("1. Check if the website is still operational")
@@ -8,6 +8,7 @@ if the issue is with proxies rather than URLs.
 """
 
 import aiohttp
+import aiofiles
 import asyncio
 import sys
 from pathlib import Path
@@ -15,6 +16,15 @@ import logging
 import os
 from urllib.parse import urlparse, unquote
 import time
+from types import MappingProxyType
+from functools import lru_cache
+
+# Optional async DNS resolver
+try:
+    import aiodns  # noqa: F401
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(
@@ -28,13 +38,40 @@ logging.basicConfig(
 
 logger = logging.getLogger("direct-test")
 
-async def download_rom_direct(url, output_dir):
+# Browser-like headers shared by every request in the session
+COMMON_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/octet-stream,application/zip,application/x-zip-compressed,*/*',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+})
+
+PROGRESS_INTERVAL = 0.5  # Seconds between progress line updates
+
+@lru_cache(maxsize=1024)
+def parse_rom_url(url):
+    """Split a ROM URL once into its parts and the local file name"""
+    url_parts = urlparse(url)
+    return url_parts, os.path.basename(unquote(url_parts.path))
+
+def drop_from_page_cache(path):
+    """Tell the kernel a finished download won't be read again (POSIX only)"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)  # Dirty pages can't be dropped until they reach disk
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+async def download_rom_direct(session, url, output_dir):
     """Test downloading a ROM directly without proxies"""
     print(f"\n⬇️ Testing direct download from: {url}")
     
     # Parse the URL to get the filename
-    url_parts = urlparse(url)
-    rom_name = os.path.basename(unquote(url_parts.path))
+    url_parts, rom_name = parse_rom_url(url)
     
     # Create output directory
     output_dir = Path(output_dir)
@@ -43,80 +80,76 @@ async def download_rom_direct(url, output_dir):
     # Path to save the file
     output_path = output_dir / rom_name
     
-    # Headers with browser-like settings
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'application/octet-stream,application/zip,application/x-zip-compressed,*/*',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Referer': f"{url_parts.scheme}://{url_parts.netloc}/",
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
+    # The session carries the common headers; only the referer varies per URL
+    headers = {'Referer': f"{url_parts.scheme}://{url_parts.netloc}/"}
     
     try:
-        async with aiohttp.ClientSession() as session:
-            print(f"📥 Downloading: {rom_name}")
+        print(f"📥 Downloading: {rom_name}")
+        
+        # Download the ROM
+        async with session.get(url, headers=headers, allow_redirects=True) as response:
+            print(f"📊 Status: {response.status}")
+            print(f"📝 Content-Type: {response.headers.get('content-type', 'unknown')}")
+            
+            # Check if we got redirected
+            if response.history:
+                print(f"⤴️ Redirected from: {response.history[0].url} to {response.url}")
             
-            # Download the ROM
-            async with session.get(url, headers=headers, allow_redirects=True) as response:
-                print(f"📊 Status: {response.status}")
-                print(f"📝 Content-Type: {response.headers.get('content-type', 'unknown')}")
+            # Check if we got HTML instead of ROM data
+            first_chunk = await response.content.read(1024)
+            first_chunk_text = first_chunk.decode('utf-8', errors='ignore').lower()
+            
+            if '<html' in first_chunk_text or '<!doctype html' in first_chunk_text:
+                print(f"❌ Received HTML content instead of ROM file")
                 
-                # Check if we got redirected
-                if response.history:
-                    print(f"⤴️ Redirected from: {response.history[0].url} to {response.url}")
+                # Extract title if present
+                if '<title>' in first_chunk_text and '</title>' in first_chunk_text:
+                    title_start = first_chunk_text.find('<title>') + 7
+                    title_end = first_chunk_text.find('</title>')
+                    page_title = first_chunk_text[title_start:title_end].strip()
+                    print(f"📄 Error page title: {page_title}")
                 
-                # Check if we got HTML instead of ROM data
-                first_chunk = await response.content.read(1024)
-                first_chunk_text = first_chunk.decode('utf-8', errors='ignore').lower()
+                # Save the HTML for debugging
+                debug_path = Path("debug_html")
+                debug_path.mkdir(exist_ok=True)
+                error_path = debug_path / f"error_{rom_name}.html"
                 
-                if '<html' in first_chunk_text or '<!doctype html' in first_chunk_text:
-                    print(f"❌ Received HTML content instead of ROM file")
-                    
-                    # Extract title if present
-                    if '<title>' in first_chunk_text and '</title>' in first_chunk_text:
-                        title_start = first_chunk_text.find('<title>') + 7
-                        title_end = first_chunk_text.find('</title>')
-                        page_title = first_chunk_text[title_start:title_end].strip()
-                        print(f"📄 Error page title: {page_title}")
-                    
-                    # Save the HTML for debugging
-                    debug_path = Path("debug_html")
-                    debug_path.mkdir(exist_ok=True)
-                    error_path = debug_path / f"error_{rom_name}.html"
-                    
-                    with open(error_path, 'wb') as f:
-                        f.write(first_chunk)
-                        # Read and write the rest of the content
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                    
-                    print(f"💾 Saved error HTML to: {error_path}")
-                    return False
+                # The first chunk is enough to diagnose the page; drop the rest
+                with open(error_path, 'wb') as f:
+                    f.write(first_chunk)
+                response.close()
                 
-                # Valid ROM content, save to file
-                with open(output_path, 'wb') as f:
-                    f.write(first_chunk)  # Write the first chunk we already read
-                    
-                    # Then download the rest
-                    start_time = time.time()
-                    downloaded = len(first_chunk)
-                    
-                    async for chunk in response.content.iter_chunked(1024*1024):
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        # Calculate and display download speed
-                        elapsed = time.time() - start_time
-                        if elapsed > 0:
-                            speed = downloaded / elapsed / (1024*1024)
-                            print(f"\r📥 Downloaded: {downloaded/(1024*1024):.2f} MB ({speed:.2f} MB/s)", end="")
+                print(f"💾 Saved error HTML to: {error_path}")
+                return False
+            
+            # Valid ROM content, save to file
+            # aiofiles runs the writes in a thread so the socket keeps draining
+            async with aiofiles.open(output_path, 'wb') as f:
+                await f.write(first_chunk)  # Write the first chunk we already read
                 
-                # Complete
-                file_size = output_path.stat().st_size
-                print(f"\n✅ Download complete: {rom_name} ({file_size/(1024*1024):.2f} MB)")
-                return True
+                # Then download the rest
+                start_time = time.monotonic()
+                next_report = start_time + PROGRESS_INTERVAL
+                downloaded = len(first_chunk)
                 
+                async for chunk in response.content.iter_any():
+                    await f.write(chunk)
+                    downloaded += len(chunk)
+                    
+                    # Display download speed at most every PROGRESS_INTERVAL seconds
+                    now = time.monotonic()
+                    if now >= next_report:
+                        speed = downloaded / (now - start_time) / (1024*1024)
+                        print(f"\r📥 Downloaded: {downloaded/(1024*1024):.2f} MB ({speed:.2f} MB/s)", end="")
+                        next_report = now + PROGRESS_INTERVAL
+            
+            # Complete
+            file_size = output_path.stat().st_size
+            # The flush can take a while for a large file; keep other downloads going
+            await asyncio.to_thread(drop_from_page_cache, output_path)
+            print(f"\n✅ Download complete: {rom_name} ({file_size/(1024*1024):.2f} MB)")
+            return True
+            
     except Exception as e:
         print(f"❌ Error downloading ROM: {e}")
         logger.exception(f"Error downloading ROM: {e}")
@@ -135,12 +168,21 @@ async def main():
     
     output_dir = "ROM_Downloads_Direct_Test"
     
-    success_count = 0
-    for url in test_urls:
-        print(f"\n🔍 Testing URL: {url}")
-        result = await download_rom_direct(url, output_dir)
-        if result:
-            success_count += 1
+    # One pooled session for every URL so keep-alive connections are reused
+    resolver = aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None
+    connector = aiohttp.TCPConnector(resolver=resolver, use_dns_cache=True, ttl_dns_cache=300,
+                                     limit=20, limit_per_host=4, keepalive_timeout=30)
+    semaphore = asyncio.Semaphore(4)  # Cap parallel downloads per run
+    
+    async with aiohttp.ClientSession(connector=connector, headers=COMMON_HEADERS) as session:
+        async def bounded_download(url):
+            async with semaphore:
+                print(f"\n🔍 Testing URL: {url}")
+                return await download_rom_direct(session, url, output_dir)
+        
+        results = await asyncio.gather(*(bounded_download(url) for url in test_urls))
+    
+    success_count = sum(1 for result in results if result)
     
     print(f"\n🎮 Test Results: {success_count}/{len(test_urls)} downloads successful")
     
@@ -161,4 +203,11 @@ async def main():
         print("3. Consider disabling proxies or finding higher quality ones")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Many downloads share one loop here, so use uvloop's faster loop when
+    # it is installed (it is not available on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -12,82 +12,95 @@ import asyncio
 import sys
 from urllib.parse import unquote
 import argparse
+from types import MappingProxyType
 
-async def test_url_direct(url, show_content=False):
+# Use aiodns for DNS lookups when it is installed
+try:
+    import aiodns  # noqa: F401
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+DIRECT_TEST_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Referer': 'https://myrient.erista.me/',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+})
+
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0',
+    'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',  # Testing if blocking based on bots
+)
+
+# Header sets for the UA probes are built once; only the User-Agent differs
+_UA_PROBE_BASE = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://myrient.erista.me/',
+    'Connection': 'keep-alive',
+}
+UA_PROBE_HEADERS = tuple(
+    (ua, MappingProxyType({**_UA_PROBE_BASE, 'User-Agent': ua})) for ua in USER_AGENTS
+)
+
+async def test_url_direct(session, url, show_content=False):
     """Test direct access to a URL without proxies"""
     print(f"\n🔍 Testing direct access to URL: {url}")
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Referer': 'https://myrient.erista.me/',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, allow_redirects=True) as response:
-                print(f"📊 Status Code: {response.status}")
-                print(f"📝 Content Type: {response.headers.get('content-type', 'unknown')}")
-                
-                # Check for redirects
-                if response.history:
-                    print(f"⤴️  Redirected from: {response.history[0].url} to {response.url}")
-                
-                # Get content and check if it's HTML
-                content = await response.read()
-                content_start = content[:500].decode('utf-8', errors='ignore')
-                
-                is_html = '<html' in content_start.lower() or '<!doctype html' in content_start.lower()
-                
-                if is_html:
-                    print(f"❌ Received HTML content instead of a file")
-                    if show_content:
-                        print(f"\nContent Preview:\n{content_start}...\n")
+        async with session.get(url, headers=DIRECT_TEST_HEADERS, allow_redirects=True) as response:
+            print(f"📊 Status Code: {response.status}")
+            print(f"📝 Content Type: {response.headers.get('content-type', 'unknown')}")
+            
+            # Check for redirects
+            if response.history:
+                print(f"⤴️  Redirected from: {response.history[0].url} to {response.url}")
+            
+            # Get content and check if it's HTML
+            content = await response.read()
+            content_start = content[:500].decode('utf-8', errors='ignore')
+            
+            is_html = '<html' in content_start.lower() or '<!doctype html' in content_start.lower()
+            
+            if is_html:
+                print(f"❌ Received HTML content instead of a file")
+                if show_content:
+                    print(f"\nContent Preview:\n{content_start}...\n")
+            else:
+                content_length = response.headers.get('content-length')
+                if content_length:
+                    size_mb = int(content_length) / (1024 * 1024)
+                    print(f"✅ Received binary content - Size: {size_mb:.2f} MB")
                 else:
-                    content_length = response.headers.get('content-length')
-                    if content_length:
-                        size_mb = int(content_length) / (1024 * 1024)
-                        print(f"✅ Received binary content - Size: {size_mb:.2f} MB")
-                    else:
-                        print(f"✅ Received binary content - Size: {len(content)} bytes")
+                    print(f"✅ Received binary content - Size: {len(content)} bytes")
     
     except Exception as e:
         print(f"❌ Error accessing URL: {e}")
 
-async def test_with_multiple_user_agents(url):
+async def test_with_multiple_user_agents(session, url):
     """Test URL with multiple user agents to see if site is blocking based on UA"""
-    user_agents = [
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
-        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15',
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0',
-        'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',  # Testing if blocking based on bots
-    ]
-    
     print("\n🧪 Testing URL with multiple user agents:")
     
-    for ua in user_agents:
+    async def probe(ua, headers):
         try:
-            headers = {
-                'User-Agent': ua,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Referer': 'https://myrient.erista.me/',
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, allow_redirects=True) as response:
-                    content_type = response.headers.get('content-type', 'unknown')
-                    is_html = 'text/html' in content_type
-                    
-                    print(f"🔍 UA: {ua[:30]}... | Status: {response.status} | HTML: {'Yes' if is_html else 'No'}")
+            async with session.get(url, headers=headers, allow_redirects=True) as response:
+                content_type = response.headers.get('content-type', 'unknown')
+                is_html = 'text/html' in content_type
+                return f"🔍 UA: {ua[:30]}... | Status: {response.status} | HTML: {'Yes' if is_html else 'No'}"
         
         except Exception as e:
-            print(f"❌ Error with UA '{ua[:30]}...': {e}")
+            return f"❌ Error with UA '{ua[:30]}...': {e}"
+    
+    # The probes are independent, so run them together and report in order
+    for line in await asyncio.gather(*(probe(ua, headers) for ua, headers in UA_PROBE_HEADERS)):
+        print(line)
 
 async def main():
     parser = argparse.ArgumentParser(description='Test direct access to ROM URLs')
@@ -107,10 +120,17 @@ async def main():
     print("================================")
     print(f"Testing URL: {unquote(url)}")
     
-    await test_url_direct(url, args.show_content)
-    
-    if args.multiple_ua:
-        await test_with_multiple_user_agents(url)
+    # main() owns the pooled session so its connections are reused; it keeps
+    # no cookies, so each request is judged on its own headers as it would
+    # be from a fresh session
+    resolver = aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None
+    connector = aiohttp.TCPConnector(resolver=resolver, use_dns_cache=True, ttl_dns_cache=300,
+                                     keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+        await test_url_direct(session, url, args.show_content)
+        
+        if args.multiple_ua:
+            await test_with_multiple_user_agents(session, url)
     
     print("\n📝 Conclusions:")
     print("1. If you received HTML instead of binary content, the website may be:")
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Shared Async ROM URL Prober
+
+This module holds the probing logic used by both the URL validator and the
+alternative source scanner. One prober keeps a single HTTP client, a short
+lived result cache and per-host backoff, so every entry point that shares it
+also shares those.
+"""
+
+import asyncio
+import httpx
+import json
+import logging
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urlparse, unquote, quote
+import re
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the h2 package (pip install httpx[http2]); otherwise use HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+PROBE_CACHE_TTL = 300  # seconds a probe result is reused
+PROBE_CACHE_SIZE = 1024
+
+# Working URLs are also remembered on disk so later runs can skip them
+PROBE_DB_PATH = Path.home() / '.cache' / 'rom_url_prober.sqlite'
+PROBE_DB_TTL = 24 * 60 * 60  # seconds
+
+MAX_CONCURRENT_PROBES = 8
+PREVIEW_BYTES = 2048  # Enough of an error page to find its <title>
+
+RATE_LIMIT_STATUSES = (429, 503)
+MAX_BACKOFF = 30  # seconds
+
+CONSOLE_RE = re.compile(r'Nintendo\s*-\s*(\w+)', re.IGNORECASE)
+TITLE_RE = re.compile(r'<title>(.*?)</title>', re.IGNORECASE)
+
+def iter_unique(urls):
+    """Yield each URL the first time it appears"""
+    seen = set()
+    for url in urls:
+        if url not in seen:
+            seen.add(url)
+            yield url
+
+class AsyncRomUrlProber:
+    """Probe ROM URLs over one shared client and suggest alternatives"""
+    
+    def __init__(self, db_path=PROBE_DB_PATH):
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'application/octet-stream,application/zip,application/x-zip-compressed,*/*',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Connection': 'keep-alive'
+        }
+        
+        # Mirror sites to try for ROMs from known hosts
+        self.alternative_domains = {
+            "myrient.erista.me": ["wowroms.com/en/roms",
+                                  "romsgames.net/roms"],
+            "www.myrient.erista.me": ["wowroms.com/en/roms",
+                                      "romsgames.net/roms"]
+        }
+        
+        # URL path transformations to try
+        self.path_transformations = [
+            # Original path
+            lambda path: path,
+            # Remove complex folder structure
+            lambda path: "/" + os.path.basename(path),
+            # Try removing encoding in the path
+            lambda path: unquote(path)
+        ]
+        
+        # One client for every probe; with HTTP/2 all probes to a host share
+        # a single connection
+        self._client = None
+        
+        # url -> (checked_at, result); oldest entries are evicted first
+        self._cache = OrderedDict()
+        
+        # SQLite cache shared across runs; None disables it
+        self.db_path = db_path
+        self._db = None
+        
+        # netloc -> seconds to wait before the next probe after a 429/503
+        self._backoff = {}
+    
+    async def _get_client(self):
+        """Create the shared probe client on first use"""
+        if self._client is None or self._client.is_closed:
+            # asyncio already sets TCP_NODELAY on these sockets, so small
+            # HEAD probes are not held back by Nagle's algorithm
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers=self.headers,
+                timeout=10.0,
+                follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+        return self._client
+    
+    def _get_db(self):
+        """Open the on-disk probe cache on first use"""
+        if self._db is None and self.db_path is not None:
+            try:
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(self.db_path)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS probes ("
+                    "url TEXT PRIMARY KEY, checked_at REAL, status_code INTEGER, "
+                    "content_type TEXT, result TEXT)"
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Probe cache disabled: {e}")
+                self._db = None
+                self.db_path = None
+        return self._db
+    
+    def _load_stored(self, url):
+        """Return a fresh result for url from the on-disk cache, if any"""
+        db = self._get_db()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT checked_at, result FROM probes WHERE url = ?", (url,)
+        ).fetchone()
+        if row and time.time() - row[0] < PROBE_DB_TTL:
+            return json.loads(row[1])
+        return None
+    
+    def _store(self, result):
+        """Save a probe result to the on-disk cache"""
+        db = self._get_db()
+        if db is None:
+            return
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?)",
+                (result['url'], time.time(), result['status_code'],
+                 result['content_type'], json.dumps(result))
+            )
+    
+    def _remember(self, url, result):
+        """Add a result to the in-memory cache"""
+        self._cache[url] = (time.monotonic(), result)
+        self._cache.move_to_end(url)
+        if len(self._cache) > PROBE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    async def close(self):
+        """Close the shared probe client and the cache database"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def probe(self, url):
+        """
+        Check what a URL serves without downloading it
+        Returns dict with status, content type and (for text pages) a preview
+        """
+        cached = self._cache.get(url)
+        if cached and time.monotonic() - cached[0] < PROBE_CACHE_TTL:
+            logger.info(f"Using cached probe for: {url}")
+            return cached[1]
+        
+        stored = self._load_stored(url)
+        if stored is not None:
+            logger.info(f"Using stored probe for: {url}")
+            self._remember(url, stored)
+            return stored
+        
+        try:
+            client = await self._get_client()
+            # Add proper referrer; the client supplies the other headers
+            url_parts = urlparse(url)
+            headers = {'Referer': f"{url_parts.scheme}://{url_parts.netloc}/"}
+            
+            # Only slow down for hosts that have told us to
+            backoff = self._backoff.get(url_parts.netloc, 0)
+            if backoff:
+                await asyncio.sleep(backoff)
+            
+            # HEAD is enough for binary files; only fetch the start of the body
+            # when the server refuses HEAD or answers with a text page to sniff
+            response = await client.head(url, headers=headers)
+            status_code = response.status_code
+            response_headers = response.headers
+            
+            content_type = response_headers.get('Content-Type', '').lower()
+            content_preview = None
+            if status_code in (405, 501) or content_type.startswith('text/'):
+                headers['Range'] = f'bytes=0-{PREVIEW_BYTES - 1}'
+                async with client.stream('GET', url, headers=headers) as response:
+                    status_code = response.status_code
+                    response_headers = response.headers
+                    content_type = response_headers.get('Content-Type', '').lower()
+                    if content_type.startswith('text/'):
+                        # Collect chunks until the whole preview (or the end
+                        # of a shorter page) has arrived
+                        preview = b''
+                        async for chunk in response.aiter_bytes():
+                            preview += chunk
+                            if len(preview) >= PREVIEW_BYTES:
+                                break
+                        content_preview = preview[:PREVIEW_BYTES].decode('utf-8', errors='ignore')
+            
+            if status_code in RATE_LIMIT_STATUSES:
+                self._backoff[url_parts.netloc] = min(max(backoff * 2, 1), MAX_BACKOFF)
+                logger.warning(f"Rate limited by {url_parts.netloc} (HTTP {status_code})")
+            else:
+                self._backoff.pop(url_parts.netloc, None)
+            
+            content_size = response_headers.get('Content-Length')
+            if status_code == 206:
+                # The full size is the part of Content-Range after the slash
+                content_size = response_headers.get('Content-Range', '').rpartition('/')[2]
+                if not content_size.isdigit():
+                    content_size = None
+            
+            title_match = TITLE_RE.search(content_preview) if content_preview else None
+            is_html = content_preview is not None
+            result = {
+                'url': url,
+                # A ranged GET answers 206 for a file that is otherwise a plain 200
+                'accessible': status_code in (200, 206),
+                'status_code': status_code,
+                'content_type': content_type,
+                'headers': dict(response_headers),
+                'size': content_size,
+                'is_html': is_html,
+                'is_binary': not is_html,
+                'preview': content_preview,
+                'title': title_match.group(1) if title_match else None
+            }
+            
+            # Only real answers from the server are cached; errors and rate
+            # limits are retried on the next call
+            if status_code not in RATE_LIMIT_STATUSES:
+                self._remember(url, result)
+            
+            # Failures are kept in memory only, so a site that comes back
+            # is noticed on the next run
+            if result['accessible'] and result['is_binary']:
+                self._store(result)
+            return result
+        
+        except Exception as e:
+            logger.debug(f"Error probing URL {url}: {e}")
+            return {
+                'url': url,
+                'accessible': False,
+                'error': str(e),
+                'is_html': False,
+                'is_binary': False
+            }
+    
+    async def check_many(self, urls):
+        """Probe URLs concurrently; results come back in the same order"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+        
+        async def bounded_probe(url):
+            async with semaphore:
+                return await self.probe(url)
+        
+        return await asyncio.gather(*(bounded_probe(url) for url in urls))
+    
+    def iter_alternatives(self, url, rom_name):
+        """Yield alternative sources for a ROM as dicts with source, url and description"""
+        url_parts = urlparse(url)
+        domain = url_parts.netloc
+        path = url_parts.path
+        scheme = url_parts.scheme
+        
+        # Paths are percent-encoded, so match the console on the decoded form
+        console_match = CONSOLE_RE.search(unquote(path))
+        
+        # Archive.org keeps one set per console; without a console the URL
+        # would only be a guess
+        if console_match:
+            console = console_match.group(1).lower()
+            yield {
+                'source': 'Archive.org',
+                'url': f"https://archive.org/download/nintendo-{console}-romset/{quote(rom_name)}",
+                'description': f"Internet Archive Nintendo {console} ROM collection"
+            }
+        
+        # Same site with the folder structure removed
+        simpler_path = "/" + os.path.basename(path)
+        if simpler_path != path:
+            yield {
+                'source': 'Simplified Path',
+                'url': f"{scheme}://{domain}{simpler_path}",
+                'description': "Same site but with a simplified path"
+            }
+        
+        # Mirror sites, each with the different path transformations
+        for alt_domain in self.alternative_domains.get(domain, ()):
+            for transform in self.path_transformations:
+                yield {
+                    'source': alt_domain.split('/')[0],
+                    'url': f"{scheme}://{alt_domain}{transform(path)}",
+                    'description': f"Mirror site {alt_domain}"
+                }
+        
+        # Try adding/removing www
+        if domain.startswith('www.'):
+            yield {
+                'source': 'No www',
+                'url': f"{scheme}://{domain[4:]}{path}",
+                'description': "Same site without www prefix"
+            }
+        else:
+            yield {
+                'source': 'With www',
+                'url': f"{scheme}://www.{domain}{path}",
+                'description': "Same site with www prefix"
+            }
+        
+        # Try HTTPS if using HTTP
+        if scheme == 'http':
+            yield {
+                'source': 'HTTPS',
+                'url': f"https://{domain}{path}",
+                'description': "Same URL with HTTPS instead of HTTP"
+            }
+    
+    def generate_alternatives(self, url, rom_name):
+        """Return the alternative sources for a ROM without duplicate URLs"""
+        alternatives = {}
+        for alt in self.iter_alternatives(url, rom_name):
+            alternatives.setdefault(alt['url'], alt)
+        return list(alternatives.values())
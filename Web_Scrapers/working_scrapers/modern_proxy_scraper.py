@@ -10,15 +10,119 @@ This script works around the ProxyBroker compatibility issues by:
 
 import asyncio
 import aiohttp
+import heapq
+import itertools
+import json
+import os
 import time
 import random
 import logging
-from typing import List, Dict, Optional, Tuple
+import re
+import shelve
+from pathlib import Path
+from typing import AsyncIterator, List, Dict, Optional, Tuple, Union
 from urllib.parse import urljoin, urlparse
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, Tag
 from fake_useragent import UserAgent
 
+# aiohttp only decodes brotli responses when the brotli package is installed
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+PROXY_CACHE_TTL = 600  # seconds a proxy that worked is tried again first
+
+# Answers with an empty 204, so a proxy test moves almost no data
+PROXY_TEST_URL = 'http://www.google.com/generate_204'
+
+SOURCE_FETCH_BUDGET = 8  # seconds for all proxy lists to download
+PROXY_TEST_BUDGET = 120  # seconds for testing candidates
+
+# Expected seconds per request; proxies start equal and drift with use
+DEFAULT_PROXY_SCORE = 1.0
+FAILED_PROXY_LATENCY = 30.0  # what a failed request counts as
+
+UA_POOL_SIZE = 200  # user agents sampled up front for header rotation
+
+# Header values picked at random for each request
+ACCEPT_LANGUAGES = (
+    'en-US,en;q=0.5',
+    'en-GB,en;q=0.5',
+    'es-ES,es;q=0.9',
+    'fr-FR,fr;q=0.9',
+    'de-DE,de;q=0.9'
+)
+CACHE_CONTROLS = ('no-cache', 'max-age=0')
+REFERERS = (
+    'https://www.google.com/',
+    'https://www.bing.com/',
+    'https://duckduckgo.com/'
+)
+
+# Copied for every request; the empty values are filled in per request so
+# the header order stays the same
+BASE_HEADERS = {
+    'User-Agent': '',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': '',
+    'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': '',
+    'DNT': '1'
+}
+
+# ETag/Last-Modified of pages saved by earlier runs, keyed by URL
+HTTP_CACHE_PATH = Path('~/.cache/modern_proxy_scraper/pages').expanduser()
+
+class FilenameTable(dict):
+    """
+    str.translate table that keeps letters, digits, '-', '_' and '.' (by
+    str.isalnum, so non-ASCII letters too) and deletes everything else.
+    Each character is classified the first time it is seen.
+    """
+    
+    def __missing__(self, code: int) -> Optional[int]:
+        char = chr(code)
+        kept = code if char.isalnum() or char in '-_.' else None
+        self[code] = kept
+        return kept
+
+
+FILENAME_DELETE_TABLE = FilenameTable()
+
+class NotModified:
+    """Type of the NOT_MODIFIED sentinel"""
+
+
+# Returned by download_page when the saved copy of a page is still current
+NOT_MODIFIED = NotModified()
+
+# host:port entries anywhere in a downloaded proxy list
+IPV4_PORT = re.compile(rb'(\d{1,3}(?:\.\d{1,3}){3}:\d{1,5})')
+
+
+def has_valid_port(candidate: bytes) -> bool:
+    """Return True if the port of a host:port entry is in 1..65535"""
+    return 0 < int(candidate.rpartition(b':')[2]) < 65536
+
+
+def write_segments(path: str, segments: List[bytes]):
+    """Write byte segments to a file with a single writev where available"""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        # Windows has no writev; fall back to one joined write
+        written = os.writev(fd, segments) if hasattr(os, 'writev') else 0
+        if written < sum(len(segment) for segment in segments):
+            rest = memoryview(b''.join(segments))[written:]
+            while rest:
+                rest = rest[os.write(fd, rest):]
+    finally:
+        os.close(fd)
+
 
 class ModernProxyRotator:
     """Modern proxy rotator that works with current Python versions"""
@@ -27,35 +131,144 @@ class ModernProxyRotator:
         self.proxy_count = proxy_count
         self.timeout = timeout
         self.proxies = []
-        self.current_index = 0
         self.ua = UserAgent()
+        # Sample user agents once; picking from a list is much cheaper than
+        # asking fake_useragent on every request
+        self._ua_pool = [self.ua.random for _ in range(UA_POOL_SIZE)]
+        
+        # Long-lived session shared by proxy discovery, testing and scraping
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Working proxies from earlier runs, revalidated before a full discovery
+        self.cache_path = Path('~/.cache/modern_proxy_scraper/proxies.json').expanduser()
+        
+    @property
+    def proxies(self) -> List[Dict]:
+        """Working proxies available for rotation"""
+        return self._proxies
+    
+    @proxies.setter
+    def proxies(self, proxies: List[Dict]):
+        # Assigning a new list restarts the rotation; the heap keeps its own
+        # entries, so replace the list rather than changing it in place
+        self._proxies = proxies
+        self._order = itertools.count()  # Breaks ties between equal turns
+        self._heap = []
+        for proxy in proxies:
+            proxy.setdefault('score', DEFAULT_PROXY_SCORE)
+            self._heap.append((0.0, next(self._order), proxy))
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=200,
+                limit_per_host=10,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self):
+        """Close the shared session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def __aenter__(self):
+        await self.get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        
+    def load_cached_proxies(self) -> List[str]:
+        """Return cached proxy addresses that are still fresh enough to retry"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return []
         
-    async def fetch_proxy_list_async(self, url: str, session: aiohttp.ClientSession) -> List[str]:
-        """Fetch proxy list from a URL using aiohttp"""
+        now = time.time()
+        return [entry['proxy'] for entry in entries
+                if now - entry.get('ts', 0) < PROXY_CACHE_TTL]
+    
+    def save_cached_proxies(self, proxies: List[Dict]):
+        """Write working proxies to the cache file in one atomic step"""
+        now = time.time()
+        entries = [{'proxy': proxy['http'].split('://', 1)[1], 'ts': now} for proxy in proxies]
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            # Readers never see a half-written cache
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not save proxy cache: {e}")
+    
+    async def fetch_proxy_list_async(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> AsyncIterator[bytes]:
+        """Stream a proxy list using aiohttp, yielding host:port entries as they arrive"""
+        session = session or self._session
         try:
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                if response.status == 200:
-                    text = await response.text()
-                    return [line.strip() for line in text.split('\n') if ':' in line]
+                if response.status != 200:
+                    return
+                
+                # Only scan complete lines; the unfinished last line is kept
+                # and scanned again with the next chunk
+                tail = b''
+                async for chunk in response.content.iter_chunked(65536):
+                    data = tail + chunk
+                    cut = data.rfind(b'\n') + 1
+                    for candidate in IPV4_PORT.findall(data, 0, cut):
+                        if has_valid_port(candidate):
+                            yield candidate
+                    tail = data[cut:]
+                for candidate in IPV4_PORT.findall(tail):
+                    if has_valid_port(candidate):
+                        yield candidate
         except Exception as e:
             print(f"Error fetching from {url}: {e}")
-        return []
     
-    async def test_proxy_async(self, proxy: str, session: aiohttp.ClientSession) -> Optional[Dict]:
+    async def _tcp_reachable(self, host: str, port: int, timeout: float = 2) -> bool:
+        """Check that something accepts TCP connections on host:port"""
+        writer = None
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            return True
+        except Exception:
+            # Anything from a refused connection to a bad address means unreachable
+            return False
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
+    
+    async def test_proxy_async(self, proxy: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[Dict]:
         """Test if a proxy works using aiohttp"""
+        session = session or self._session
         try:
             proxy_url = f"http://{proxy}"
-            async with session.get(
-                'http://httpbin.org/ip',
+            # An empty 204 from a CDN measures the proxy, not the test site
+            async with session.head(
+                PROXY_TEST_URL,
                 proxy=proxy_url,
+                allow_redirects=False,
                 timeout=aiohttp.ClientTimeout(total=self.timeout)
             ) as response:
-                if response.status == 200:
-                    result = await response.json()
+                if response.status == 204:
                     return {
                         'http': proxy_url,
                         'https': proxy_url,
-                        'ip': result.get('origin', 'Unknown')
+                        # The exit IP isn't checked; this is the proxy's own
+                        'ip': proxy.rsplit(':', 1)[0]
                     }
         except Exception:
             pass
@@ -86,95 +299,142 @@ class ModernProxyRotator:
             "https://raw.githubusercontent.com/hendrikbgr/Free-Proxy-Repo/master/proxy_list.txt"
         ]
         
-        all_proxy_candidates = []
+        all_proxy_candidates = set()
         
-        async with aiohttp.ClientSession() as session:
-            # Fetch proxy lists concurrently
-            tasks = [self.fetch_proxy_list_async(url, session) for url in proxy_sources]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Callers that opened the session keep it; otherwise it only lives
+        # for this discovery run
+        owns_session = self._session is None
+        session = await self.get_session()
+        try:
+            # Proxies that worked in the last few minutes usually still do
+            cached_proxies = self.load_cached_proxies()
+            revalidated = []
+            if cached_proxies:
+                print(f"Revalidating {len(cached_proxies)} cached proxies...")
+                semaphore = asyncio.Semaphore(50)
+                
+                async def retest(proxy):
+                    async with semaphore:
+                        return await self.test_proxy_async(proxy, session)
+                
+                results = await asyncio.gather(*(retest(proxy) for proxy in cached_proxies))
+                revalidated = [result for result in results if result]
+                print(f"{len(revalidated)} cached proxies still work")
+                
+                if len(revalidated) >= self.proxy_count:
+                    self.proxies = revalidated[:self.proxy_count]
+                    self.save_cached_proxies(self.proxies)
+                    print(f"Successfully found {len(self.proxies)} working proxies")
+                    return
+            
+            # Fetch proxy lists concurrently, each streamed into a set so only
+            # unique host:port entries are held in memory
+            async def collect(url, found):
+                async for candidate in self.fetch_proxy_list_async(url, session):
+                    found.add(candidate)
+            
+            source_candidates = [set() for _ in proxy_sources]
+            tasks = [asyncio.create_task(collect(url, found))
+                     for url, found in zip(proxy_sources, source_candidates)]
+            
+            # One slow source shouldn't hold up the rest; whatever it sent
+            # before the deadline is still used
+            _, pending = await asyncio.wait(tasks, timeout=SOURCE_FETCH_BUDGET)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
             
-            for i, result in enumerate(results):
-                if isinstance(result, list):
-                    all_proxy_candidates.extend(result)
-                    print(f"Fetched {len(result)} candidates from source {i+1}")
-                elif isinstance(result, Exception):
-                    print(f"Source {i+1} failed: {result}")
+            for i, (task, found) in enumerate(zip(tasks, source_candidates)):
+                all_proxy_candidates.update(found)
+                if task in pending:
+                    print(f"Source {i+1} timed out after {len(found)} candidates")
+                elif task.exception():
+                    print(f"Source {i+1} failed: {task.exception()}")
+                else:
+                    print(f"Fetched {len(found)} candidates from source {i+1}")
             
-            # Clean and deduplicate proxy candidates
-            clean_candidates = []
-            seen = set()
-            for candidate in all_proxy_candidates:
-                if ':' in candidate and len(candidate.split(':')) == 2:
-                    host, port = candidate.strip().split(':')
-                    if host and port.isdigit() and candidate not in seen:
-                        seen.add(candidate)
-                        clean_candidates.append(candidate)
+            # Cached proxies were already tested above
+            all_proxy_candidates.difference_update(proxy.encode() for proxy in cached_proxies)
+            clean_candidates = [c.decode() for c in all_proxy_candidates]
             
             print(f"Found {len(clean_candidates)} unique proxy candidates")
             
-            # Test proxies concurrently (in batches to avoid overwhelming)
-            working_proxies = []
-            batch_size = 20
+            # Test proxies concurrently; the semaphores keep a fixed number of
+            # checks in flight so a new one starts as soon as any finishes
+            working_proxies = list(revalidated)
+            enough = asyncio.Event()
+            tcp_semaphore = asyncio.Semaphore(200)
+            semaphore = asyncio.Semaphore(50)
             
-            for i in range(0, len(clean_candidates), batch_size):
-                if len(working_proxies) >= self.proxy_count:
-                    break
-                    
-                batch = clean_candidates[i:i + batch_size]
-                print(f"Testing batch {i//batch_size + 1}: {len(batch)} proxies...")
+            async def test_candidate(proxy):
+                if enough.is_set():
+                    return None
                 
-                tasks = [self.test_proxy_async(proxy, session) for proxy in batch]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                # Most listed proxies are dead; a quick TCP handshake rules
+                # them out long before a full HTTP test would time out
+                host, port = proxy.rsplit(':', 1)
+                async with tcp_semaphore:
+                    if enough.is_set() or not await self._tcp_reachable(host, int(port)):
+                        return None
                 
-                for j, result in enumerate(results):
-                    if isinstance(result, dict):
-                        working_proxies.append(result)
-                        print(f"✓ Working proxy: {batch[j]} -> IP: {result['ip']}")
-                        
-                        if len(working_proxies) >= self.proxy_count:
-                            break
+                async with semaphore:
+                    if enough.is_set():
+                        return None
+                    result = await self.test_proxy_async(proxy, session)
+                if result and not enough.is_set():
+                    working_proxies.append(result)
+                    print(f"✓ Working proxy: {proxy} -> IP: {result['ip']}")
+                    if len(working_proxies) >= self.proxy_count:
+                        enough.set()
+                return result
+            
+            tasks = [asyncio.create_task(test_candidate(proxy)) for proxy in clean_candidates]
+            if tasks:
+                all_tested = asyncio.gather(*tasks, return_exceptions=True)
+                enough_found = asyncio.create_task(enough.wait())
+                await asyncio.wait({all_tested, enough_found}, timeout=PROXY_TEST_BUDGET,
+                                   return_when=asyncio.FIRST_COMPLETED)
                 
-                # Small delay between batches
-                await asyncio.sleep(1)
+                # Stop the tests still running once we have enough proxies or
+                # the time is up
+                enough_found.cancel()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(all_tested, enough_found, return_exceptions=True)
+        finally:
+            if owns_session:
+                await self.close()
         
         self.proxies = working_proxies
+        self.save_cached_proxies(self.proxies)
         print(f"Successfully found {len(self.proxies)} working proxies")
         
     def get_next_proxy(self) -> Optional[Dict]:
-        """Get the next proxy in rotation"""
-        if not self.proxies:
+        """Get the proxy whose turn comes next; fast proxies get more turns"""
+        if not self._heap:
             return None
-            
-        proxy = self.proxies[self.current_index]
-        self.current_index = (self.current_index + 1) % len(self.proxies)
+        
+        # Each use pushes a proxy's next turn back by its expected latency,
+        # so a proxy twice as fast is handed out twice as often
+        turn, _, proxy = heapq.heappop(self._heap)
+        heapq.heappush(self._heap, (turn + proxy['score'], next(self._order), proxy))
         return proxy
     
+    def report_result(self, proxy: Dict, latency: float, ok: bool):
+        """Fold a request's latency (or a failure) into the proxy's score"""
+        sample = latency if ok else FAILED_PROXY_LATENCY
+        proxy['score'] = 0.7 * proxy['score'] + 0.3 * sample
+    
     def get_random_headers(self) -> Dict[str, str]:
         """Generate random headers to avoid detection"""
-        headers = {
-            'User-Agent': self.ua.random,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': random.choice([
-                'en-US,en;q=0.5',
-                'en-GB,en;q=0.5',
-                'es-ES,es;q=0.9',
-                'fr-FR,fr;q=0.9',
-                'de-DE,de;q=0.9'
-            ]),
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': random.choice(['no-cache', 'max-age=0']),
-            'DNT': '1'
-        }
+        headers = BASE_HEADERS.copy()
+        headers['User-Agent'] = random.choice(self._ua_pool)
+        headers['Accept-Language'] = random.choice(ACCEPT_LANGUAGES)
+        headers['Cache-Control'] = random.choice(CACHE_CONTROLS)
         
         # Sometimes add additional headers
-        if random.choice([True, False]):
-            headers['Referer'] = random.choice([
-                'https://www.google.com/',
-                'https://www.bing.com/',
-                'https://duckduckgo.com/'
-            ])
+        if random.random() < 0.5:
+            headers['Referer'] = random.choice(REFERERS)
             
         return headers
 
@@ -186,12 +446,13 @@ class ModernWebScraperWithProxies:
                  proxy_count: int = 20,
                  delay_range: Tuple[float, float] = (1.0, 3.0),
                  max_retries: int = 3,
-                 timeout: int = 15):
+                 timeout: int = 15,
+                 concurrency: int = 5):
         self.proxy_rotator = ModernProxyRotator(proxy_count)
         self.delay_range = delay_range
         self.max_retries = max_retries
         self.timeout = timeout
-        self.session = requests.Session()
+        self.concurrency = concurrency  # Pages downloaded at the same time
         
         # Setup logging
         logging.basicConfig(
@@ -204,9 +465,28 @@ class ModernWebScraperWithProxies:
         )
         self.logger = logging.getLogger(__name__)
         
+        # Opened on first use; lets reruns send conditional requests
+        self._http_cache = None
+        
+    def _get_http_cache(self):
+        """Open the page validator cache on first use"""
+        if self._http_cache is None:
+            HTTP_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            self._http_cache = shelve.open(str(HTTP_CACHE_PATH))
+        return self._http_cache
+        
     async def initialize(self):
         """Initialize the scraper by finding proxies"""
+        # Open the rotator's session first so it stays up for scraping
+        await self.proxy_rotator.get_session()
         await self.proxy_rotator.find_proxies_async()
+    
+    async def close(self):
+        """Close the shared session and the page validator cache"""
+        await self.proxy_rotator.close()
+        if self._http_cache is not None:
+            self._http_cache.close()
+            self._http_cache = None
         
     def load_urls_from_file(self, file_path: str) -> List[str]:
         """Load URLs from a text file"""
@@ -223,42 +503,82 @@ class ModernWebScraperWithProxies:
         self.logger.info(f"Loaded {len(urls)} URLs from {file_path}")
         return urls
     
-    def download_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Download a single page with proxy and header rotation"""
+    def _report(self, proxy: Optional[Dict], start: float, ok: bool):
+        """Tell the rotator how a request through proxy went"""
+        if proxy:
+            self.proxy_rotator.report_result(proxy, time.monotonic() - start, ok)
+    
+    async def download_page(self, session: aiohttp.ClientSession, url: str,
+                            output_dir: Optional[str] = None) -> Union[BeautifulSoup, NotModified, None]:
+        """
+        Download a single page with proxy and header rotation
+        Returns NOT_MODIFIED if the copy an earlier run saved in output_dir is current
+        """
+        # Only ask for a 304 when the saved copy is still there to fall back
+        # on, and is in the directory this run writes to
+        http_cache = self._get_http_cache()
+        cached = http_cache.get(url)
+        if cached and not (
+            output_dir
+            and os.path.dirname(os.path.abspath(cached['file'])) == os.path.abspath(output_dir)
+            and os.path.exists(cached['file'])
+        ):
+            cached = None
+        
         for attempt in range(self.max_retries):
             try:
                 # Get proxy and headers
                 proxy = self.proxy_rotator.get_next_proxy()
                 headers = self.proxy_rotator.get_random_headers()
+                if cached:
+                    if cached['etag']:
+                        headers['If-None-Match'] = cached['etag']
+                    if cached['last_modified']:
+                        headers['If-Modified-Since'] = cached['last_modified']
                 
                 # Log attempt
                 proxy_info = f"{proxy['http']}" if proxy else "No proxy"
                 self.logger.info(f"Attempt {attempt + 1} for {url} using {proxy_info}")
                 
                 # Make request
-                proxies = {'http': proxy['http'], 'https': proxy['https']} if proxy else None
-                response = self.session.get(
+                start = time.monotonic()
+                async with session.get(
                     url,
                     headers=headers,
-                    proxies=proxies,
-                    timeout=self.timeout,
+                    proxy=proxy['http'] if proxy else None,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
                     allow_redirects=True
-                )
+                ) as response:
+                    if response.status == 304:
+                        self.logger.info(f"Not modified since last run: {url}")
+                        self._report(proxy, start, True)
+                        return NOT_MODIFIED
+                    response.raise_for_status()
+                    body = await response.read()
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+                self._report(proxy, start, True)
                 
-                response.raise_for_status()
+                # The saved file is filled in once the page has been written
+                if etag or last_modified:
+                    http_cache[url] = {'etag': etag, 'last_modified': last_modified, 'file': ''}
                 
-                # Parse with Beautiful Soup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                # Parse with Beautiful Soup in a worker thread so other
+                # downloads keep running; lxml's C parser is several times
+                # faster than html.parser on large pages
+                loop = asyncio.get_running_loop()
+                soup = await loop.run_in_executor(None, BeautifulSoup, body, 'lxml')
                 
                 self.logger.info(f"Successfully downloaded: {url}")
                 return soup
                 
-            except requests.exceptions.RequestException as e:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._report(proxy, start, False)
                 self.logger.warning(f"Error downloading {url} (attempt {attempt + 1}): {e}")
                 if attempt < self.max_retries - 1:
                     # Wait before retry
                     wait_time = random.uniform(2, 5)
-                    time.sleep(wait_time)
+                    await asyncio.sleep(wait_time)
                 else:
                     self.logger.error(f"Failed to download {url} after {self.max_retries} attempts")
                     
@@ -277,93 +597,128 @@ class ModernWebScraperWithProxies:
             'images': []
         }
         
-        # Extract title
-        title_tag = soup.find('title')
+        # Walk the tree once, picking up the title, text, links and images
+        # as they appear
+        title_tag = None
+        text_parts = []
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                if node.name == 'title' and title_tag is None:
+                    title_tag = node
+                elif node.name == 'a' and node.has_attr('href'):
+                    content['links'].append({
+                        'url': urljoin(url, node['href']),
+                        'text': node.get_text().strip()
+                    })
+                elif node.name == 'img' and node.has_attr('src'):
+                    content['images'].append({
+                        'url': urljoin(url, node['src']),
+                        'alt': node.get('alt', '').strip()
+                    })
+            # Skip comments and the content of script and style tags
+            elif type(node) is NavigableString and node.parent.name not in ('script', 'style'):
+                text_parts.append(node)
+        
         if title_tag:
             content['title'] = title_tag.get_text().strip()
-            
-        # Extract main text (remove script and style content)
-        for script in soup(["script", "style"]):
-            script.decompose()
-        content['text'] = soup.get_text().strip()
-        
-        # Extract links
-        for link in soup.find_all('a', href=True):
-            full_url = urljoin(url, link['href'])
-            content['links'].append({
-                'url': full_url,
-                'text': link.get_text().strip()
-            })
-            
-        # Extract images
-        for img in soup.find_all('img', src=True):
-            full_url = urljoin(url, img['src'])
-            content['images'].append({
-                'url': full_url,
-                'alt': img.get('alt', '').strip()
-            })
+        content['text'] = ''.join(text_parts).strip()
             
         return content
     
-    def save_content(self, content: Dict, output_dir: str = 'downloads'):
-        """Save extracted content to files"""
+    async def save_content(self, content: Dict, output_dir: str = 'downloads'):
+        """Save extracted content to files without blocking other downloads; returns the text file path"""
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             
         # Create filename from URL
         parsed = urlparse(content['url'])
         filename = f"{parsed.netloc}_{parsed.path.replace('/', '_')}"
-        filename = "".join(c for c in filename if c.isalnum() or c in ('-', '_', '.'))
+        filename = filename.translate(FILENAME_DELETE_TABLE)
         
         if not filename or filename == '_':
             filename = f"page_{hash(content['url']) % 10000}"
             
-        # Save as text file
+        # Save as text file; each file is one syscall, run in a thread so
+        # other downloads keep going
         text_file = os.path.join(output_dir, f"{filename}.txt")
-        with open(text_file, 'w', encoding='utf-8') as f:
-            f.write(f"URL: {content['url']}\n")
-            f.write(f"Title: {content['title']}\n")
-            f.write("=" * 50 + "\n\n")
-            f.write(content['text'])
+        await asyncio.to_thread(write_segments, text_file, [
+            f"URL: {content['url']}\n".encode('utf-8'),
+            f"Title: {content['title']}\n".encode('utf-8'),
+            b"=" * 50 + b"\n\n",
+            content['text'].encode('utf-8')
+        ])
             
         # Save links as separate file
         links_file = os.path.join(output_dir, f"{filename}_links.txt")
-        with open(links_file, 'w', encoding='utf-8') as f:
-            for link in content['links']:
-                f.write(f"{link['url']}\t{link['text']}\n")
+        links = ''.join(f"{link['url']}\t{link['text']}\n" for link in content['links'])
+        await asyncio.to_thread(write_segments, links_file, [links.encode('utf-8')])
                 
         self.logger.info(f"Saved content to {text_file}")
+        return text_file
     
-    def scrape_urls(self, urls: List[str], output_dir: str = 'downloads'):
-        """Scrape multiple URLs with delay and proxy rotation"""
-        total_urls = len(urls)
-        successful = 0
-        failed = 0
-        
-        self.logger.info(f"Starting to scrape {total_urls} URLs")
-        
-        for i, url in enumerate(urls, 1):
-            self.logger.info(f"Processing {i}/{total_urls}: {url}")
+    async def _scrape_one(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                          url: str, output_dir: str) -> bool:
+        """Download, extract and save one URL; returns True on success"""
+        async with semaphore:
+            self.logger.info(f"Processing: {url}")
             
             # Download page
-            soup = self.download_page(url)
+            soup = await self.download_page(session, url, output_dir)
             
-            if soup:
+            if soup is NOT_MODIFIED:
+                self.logger.info(f"Keeping saved copy of: {url}")
+            elif soup:
                 # Extract content
                 content = self.extract_content(soup, url)
                 
                 # Save content
-                self.save_content(content, output_dir)
-                successful += 1
-            else:
-                failed += 1
+                text_file = await self.save_content(content, output_dir)
                 
-            # Random delay between requests
-            if i < total_urls:  # Don't delay after the last URL
+                # Remember where the page went so a rerun can ask for a 304
+                http_cache = self._get_http_cache()
+                cached = http_cache.get(url)
+                if cached:
+                    cached['file'] = text_file
+                    http_cache[url] = cached
+            
+            return soup is not None
+    
+    async def _scrape_host(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                           urls: List[str], output_dir: str) -> int:
+        """Scrape one host's URLs in order with a polite delay between them; returns successes"""
+        successful = 0
+        for i, url in enumerate(urls):
+            # Random delay before hitting the same host again
+            if i:
                 delay = random.uniform(*self.delay_range)
-                self.logger.info(f"Waiting {delay:.2f} seconds before next request...")
-                time.sleep(delay)
-                
+                self.logger.info(f"Waiting {delay:.2f} seconds before next request to {urlparse(url).netloc}...")
+                await asyncio.sleep(delay)
+            successful += await self._scrape_one(session, semaphore, url, output_dir)
+        return successful
+    
+    async def scrape_urls(self, urls: List[str], output_dir: str = 'downloads'):
+        """Scrape multiple URLs concurrently with delay and proxy rotation"""
+        total_urls = len(urls)
+        
+        self.logger.info(f"Starting to scrape {total_urls} URLs")
+        
+        # Each host gets its own queue so the politeness delay only slows
+        # down requests to that host; different hosts are scraped in parallel
+        urls_by_host = {}
+        for url in urls:
+            urls_by_host.setdefault(urlparse(url).netloc, []).append(url)
+        
+        # Pages reuse the rotator's connection pool; the semaphore caps how
+        # many pages are in flight
+        session = await self.proxy_rotator.get_session()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *[self._scrape_host(session, semaphore, host_urls, output_dir)
+              for host_urls in urls_by_host.values()]
+        )
+        
+        successful = sum(results)
+        failed = total_urls - successful
         self.logger.info(f"Scraping completed. Success: {successful}, Failed: {failed}")
 
 
@@ -412,7 +767,7 @@ async def main():
         
         if proceed == 'y':
             # Start scraping
-            scraper.scrape_urls(urls, output_dir)
+            await scraper.scrape_urls(urls, output_dir)
             print(f"\nScraping completed! Check the '{output_dir}' folder for results.")
         else:
             print("Scraping cancelled.")
@@ -423,21 +778,11 @@ async def main():
         print("\nScraping interrupted by user.")
     except Exception as e:
         print(f"Unexpected error: {e}")
+    finally:
+        await scraper.close()
         
 
 if __name__ == "__main__":
-    # Add missing import
-    import os
-    
-    # Install aiohttp if not present
-    try:
-        import aiohttp
-    except ImportError:
-        print("Installing aiohttp...")
-        import subprocess
-        subprocess.run(['pip', 'install', 'aiohttp'])
-        import aiohttp
-    
     # Only run the scraper if directly executed, not imported
     try:
         asyncio.run(main())
@@ -12,14 +12,25 @@ This enhanced version includes:
 
 import asyncio
 import aiohttp
-import time
+import os
 import random
-import logging
-from typing import List, Dict, Optional, Tuple
-from urllib.parse import urljoin, urlparse
-import requests
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
+import re
+import time
+from pathlib import Path
+from typing import List, Dict, Optional
+
+# Optional async DNS resolver
+try:
+    import aiodns  # noqa: F401
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+# One ip:port entry on a line of a proxy list
+PROXY_RE = re.compile(rb'(?:\d{1,3}\.){3}\d{1,3}:\d{1,5}')
+
+CANDIDATE_TARGET = 5000  # unique candidates to collect before the remaining sources are dropped
+CANDIDATE_CACHE_TTL = 600  # seconds fetched proxy lists are reused before refetching
 
 
 class EnhancedModernProxyRotator:
@@ -30,7 +41,7 @@ class EnhancedModernProxyRotator:
         self.timeout = timeout
         self.proxies = []
         self.current_index = 0
-        self.ua = UserAgent()
+        self.candidate_cache_path = Path('~/.cache/proxy_scraper/candidates.txt').expanduser()
         
         # Enhanced browser profiles for realistic behavior
         self.browser_profiles = {
@@ -96,32 +107,97 @@ class EnhancedModernProxyRotator:
             }
         }
         
-    async def fetch_proxy_list_async(self, url: str, session: aiohttp.ClientSession) -> List[str]:
-        """Fetch proxy list from a URL using aiohttp"""
+        # Every base header set a profile can produce, built once and grouped
+        # by browser so each browser stays equally likely
+        self._base_header_variants = tuple(
+            tuple(self._build_base_headers(browser, profile, user_agent, language)
+                  for user_agent in profile['user_agents']
+                  for language in profile['accept_language'])
+            for browser, profile in self.browser_profiles.items()
+        )
+        self._cache_controls = ('no-cache', 'max-age=0', 'no-cache, no-store, must-revalidate')
+        self._referers = (
+            'https://www.google.com/',
+            'https://www.bing.com/',
+            'https://duckduckgo.com/',
+            'https://www.google.co.uk/',
+            'https://search.yahoo.com/'
+        )
+        
+    @staticmethod
+    def _build_base_headers(browser: str, profile: Dict, user_agent: str, language: str) -> Dict[str, str]:
+        """Base headers for one browser, user agent and language combination"""
+        headers = {
+            'User-Agent': user_agent,
+            'Accept': profile['accept'],
+            'Accept-Encoding': profile['accept_encoding'],
+            'Accept-Language': language,
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        }
+        
+        # Add browser-specific headers
+        if browser == 'chrome':
+            headers.update({
+                'sec-ch-ua': profile['sec_ch_ua'],
+                'sec-ch-ua-mobile': profile['sec_ch_ua_mobile'],
+                'sec-ch-ua-platform': profile['sec_ch_ua_platform'],
+                'Sec-Fetch-Dest': profile['sec_fetch_dest'],
+                'Sec-Fetch-Mode': profile['sec_fetch_mode'],
+                'Sec-Fetch-Site': profile['sec_fetch_site'],
+                'Sec-Fetch-User': profile['sec_fetch_user']
+            })
+        elif browser == 'firefox':
+            if 'upgrade_insecure_requests' in profile:
+                headers['Upgrade-Insecure-Requests'] = profile['upgrade_insecure_requests']
+        return headers
+        
+    def load_cached_candidates(self) -> List[bytes]:
+        """Return the cached candidate list if it was fetched recently enough"""
+        try:
+            if time.time() - self.candidate_cache_path.stat().st_mtime >= CANDIDATE_CACHE_TTL:
+                return []
+            return self.candidate_cache_path.read_bytes().splitlines()
+        except OSError:
+            return []
+    
+    def save_cached_candidates(self, candidates: List[bytes]):
+        """Write the candidate list to the cache file in one atomic step"""
+        try:
+            self.candidate_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.candidate_cache_path.with_suffix('.tmp')
+            tmp_path.write_bytes(b'\n'.join(candidates))
+            # Readers never see a half-written cache
+            os.replace(tmp_path, self.candidate_cache_path)
+        except OSError as e:
+            print(f"Could not save candidate cache: {e}")
+    
+    async def fetch_proxy_list_async(self, url: str, session: aiohttp.ClientSession) -> List[bytes]:
+        """Fetch proxy list from a URL using aiohttp; returns valid ip:port entries"""
+        candidates = []
         try:
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
                 if response.status == 200:
-                    text = await response.text()
-                    return [line.strip() for line in text.split('\n') if ':' in line]
+                    # Read line by line so the whole list is never held as one string
+                    async for raw in response.content:
+                        line = raw.strip()
+                        if PROXY_RE.fullmatch(line):
+                            candidates.append(line)
         except Exception as e:
             print(f"Error fetching from {url}: {e}")
-        return []
+        return candidates
     
     async def test_proxy_async(self, proxy: str, session: aiohttp.ClientSession) -> Optional[Dict]:
         """Test if a proxy works using aiohttp"""
         try:
             proxy_url = f"http://{proxy}"
-            async with session.get(
-                'http://httpbin.org/ip',
-                proxy=proxy_url,
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
-            ) as response:
+            async with session.get('http://httpbin.org/ip', proxy=proxy_url) as response:
+                # The status alone shows the proxy works; skip reading the body
                 if response.status == 200:
-                    result = await response.json()
                     return {
                         'http': proxy_url,
                         'https': proxy_url,
-                        'ip': result.get('origin', 'Unknown')
+                        'ip': proxy.rsplit(':', 1)[0]
                     }
         except Exception:
             pass
@@ -151,55 +227,73 @@ class EnhancedModernProxyRotator:
             "https://raw.githubusercontent.com/hendrikbgr/Free-Proxy-Repo/master/proxy_list.txt"
         ]
         
-        all_proxy_candidates = []
-        
-        async with aiohttp.ClientSession() as session:
-            # Fetch proxy lists concurrently
-            tasks = [self.fetch_proxy_list_async(url, session) for url in proxy_sources]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for i, result in enumerate(results):
-                if isinstance(result, list):
-                    all_proxy_candidates.extend(result)
-                    print(f"Fetched {len(result)} candidates from source {i+1}")
-                elif isinstance(result, Exception):
-                    print(f"Source {i+1} failed: {result}")
-            
-            # Clean and deduplicate
-            clean_candidates = []
-            seen = set()
-            for candidate in all_proxy_candidates:
-                if ':' in candidate and len(candidate.split(':')) == 2:
-                    host, port = candidate.strip().split(':')
-                    if host and port.isdigit() and candidate not in seen:
-                        seen.add(candidate)
-                        clean_candidates.append(candidate)
+        # One pool for every fetch and test, so DNS answers and connections
+        # to the proxies are reused; tests use the session-wide timeout
+        connector = aiohttp.TCPConnector(
+            resolver=aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None,
+            limit=500,
+            ttl_dns_cache=3600,
+            use_dns_cache=True,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            # Lists fetched in the last few minutes are reused as they are
+            clean_candidates = self.load_cached_candidates()
+            if clean_candidates:
+                print(f"Using {len(clean_candidates)} cached proxy candidates")
+            else:
+                # Fetch proxy lists concurrently and stop once there are
+                # enough candidates; the slowest sources are not waited for.
+                # The sources only return valid entries, still as bytes
+                clean_candidates = []
+                seen = set()
+                add = clean_candidates.append
+                tasks = [asyncio.create_task(self.fetch_proxy_list_async(url, session)) for url in proxy_sources]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        result = await next_done
+                        print(f"Fetched {len(result)} candidates from a source")
+                        for candidate in result:
+                            if candidate not in seen:
+                                seen.add(candidate)
+                                add(candidate)
+                        
+                        if len(clean_candidates) >= CANDIDATE_TARGET:
+                            break
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                
+                self.save_cached_candidates(clean_candidates)
             
             print(f"Found {len(clean_candidates)} unique proxy candidates")
             
-            # Test proxies in batches
+            # Test every candidate as its own task; the semaphore keeps a
+            # fixed number in flight, so one slow proxy never holds up others
             working_proxies = []
-            batch_size = 20
+            semaphore = asyncio.Semaphore(200)
             
-            for i in range(0, len(clean_candidates), batch_size):
-                if len(working_proxies) >= self.proxy_count:
-                    break
-                    
-                batch = clean_candidates[i:i + batch_size]
-                print(f"Testing batch {i//batch_size + 1}: {len(batch)} proxies...")
-                
-                tasks = [self.test_proxy_async(proxy, session) for proxy in batch]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for j, result in enumerate(results):
-                    if isinstance(result, dict):
+            async def gated(proxy):
+                async with semaphore:
+                    return proxy, await self.test_proxy_async(proxy, session)
+            
+            tasks = [asyncio.create_task(gated(proxy.decode('ascii'))) for proxy in clean_candidates]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    proxy, result = await next_done
+                    if result:
                         working_proxies.append(result)
-                        print(f"✓ Working proxy: {batch[j]} -> IP: {result['ip']}")
+                        print(f"✓ Working proxy: {proxy} -> IP: {result['ip']}")
                         
                         if len(working_proxies) >= self.proxy_count:
                             break
-                
-                await asyncio.sleep(1)
+            finally:
+                # Stop the tests still running once we have enough proxies
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
         
         self.proxies = working_proxies
         print(f"Successfully found {len(self.proxies)} working proxies")
@@ -215,66 +309,31 @@ class EnhancedModernProxyRotator:
     
     def get_enhanced_random_headers(self) -> Dict[str, str]:
         """PHASE 2: Enhanced header randomization with browser-specific patterns"""
-        # Choose a random browser profile
-        browser = random.choice(list(self.browser_profiles.keys()))
-        profile = self.browser_profiles[browser]
-        
-        # Base headers from browser profile
-        headers = {
-            'User-Agent': random.choice(profile['user_agents']),
-            'Accept': profile['accept'],
-            'Accept-Encoding': profile['accept_encoding'],
-            'Accept-Language': random.choice(profile['accept_language']),
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
+        # One draw supplies every random choice below; each choice reads its
+        # own 10-bit field, so a chance of p is a field value below p * 1024
+        bits = random.getrandbits(80)
         
-        # Add browser-specific headers
-        if browser == 'chrome':
-            headers.update({
-                'sec-ch-ua': profile['sec_ch_ua'],
-                'sec-ch-ua-mobile': profile['sec_ch_ua_mobile'],
-                'sec-ch-ua-platform': profile['sec_ch_ua_platform'],
-                'Sec-Fetch-Dest': profile['sec_fetch_dest'],
-                'Sec-Fetch-Mode': profile['sec_fetch_mode'],
-                'Sec-Fetch-Site': profile['sec_fetch_site'],
-                'Sec-Fetch-User': profile['sec_fetch_user']
-            })
-        elif browser == 'firefox':
-            if 'upgrade_insecure_requests' in profile:
-                headers['Upgrade-Insecure-Requests'] = profile['upgrade_insecure_requests']
+        # Choose a random browser profile, then one of its prebuilt header sets
+        variants = self._base_header_variants[(bits & 0x3FF) % len(self._base_header_variants)]
+        headers = variants[(bits >> 10 & 0x3FF) % len(variants)].copy()
         
         # Randomize additional optional headers
-        optional_headers = {}
         
         # Cache control (50% chance)
-        if random.choice([True, False]):
-            optional_headers['Cache-Control'] = random.choice([
-                'no-cache',
-                'max-age=0',
-                'no-cache, no-store, must-revalidate'
-            ])
+        if bits >> 20 & 0x3FF < 512:
+            headers['Cache-Control'] = self._cache_controls[(bits >> 30 & 0x3FF) % len(self._cache_controls)]
         
         # DNT header (70% chance)
-        if random.random() < 0.7:
-            optional_headers['DNT'] = '1'
+        if bits >> 40 & 0x3FF < 717:
+            headers['DNT'] = '1'
         
         # Referer (60% chance)
-        if random.random() < 0.6:
-            optional_headers['Referer'] = random.choice([
-                'https://www.google.com/',
-                'https://www.bing.com/',
-                'https://duckduckgo.com/',
-                'https://www.google.co.uk/',
-                'https://search.yahoo.com/'
-            ])
+        if bits >> 50 & 0x3FF < 614:
+            headers['Referer'] = self._referers[(bits >> 60 & 0x3FF) % len(self._referers)]
         
         # Pragma (30% chance)
-        if random.random() < 0.3:
-            optional_headers['Pragma'] = 'no-cache'
-        
-        # Add selected optional headers
-        headers.update(optional_headers)
+        if bits >> 70 & 0x3FF < 307:
+            headers['Pragma'] = 'no-cache'
         
         return headers
     